@@ -0,0 +1,85 @@
+"""
+BATCH RUNNER
+
+Description:
+-> Solves many instances of one problem (BUS_COUNT, DANCE_DEV or JUSTIFY_WORDS) in a single process.
+-> The input is the problem's usual input format, repeated once per instance (instances are simply concatenated).
+-> The whole input is read at once and split into tokens, instances are parsed and solved one after another (generator pipeline).
+-> One answer is written per line, in input order.
+
+Usage:
+python BATCH_RUNNER.py PROBLEM [FILE]
+
+PROBLEM -> BUS_COUNT, DANCE_DEV or JUSTIFY_WORDS.
+FILE    -> Input file, standard input if missing.
+
+Example:
+I/p (python BATCH_RUNNER.py DANCE_DEV):
+6
+down
+right
+down
+up
+right
+down
+3
+up
+down
+left
+
+O/p:
+2
+1
+"""
+
+import importlib
+import itertools
+import sys
+
+# Problems that can be run, each one is the name of a module with read_instance and solve functions.
+PROBLEMS = ("BUS_COUNT", "DANCE_DEV", "JUSTIFY_WORDS")
+
+# Splits the whole input into whitespace-separated tokens (bytes) and returns an iterator over them.
+# -> data : Input contents, as bytes.
+def tokenize(data):
+    return iter(data.split())
+
+# Yields the instances (argument tuples of solve) found in the token stream, until the tokens run out.
+# -> module : Solver module (BUS_COUNT, DANCE_DEV or JUSTIFY_WORDS).
+# -> tokens : Token iterator returned by tokenize.
+def read_instances(module, tokens):
+    for first in tokens:
+        # The first token was consumed to detect the end of the input, it is put back in front of the rest.
+        yield module.read_instance(itertools.chain((first,), tokens))
+
+# Yields the answer of each instance.
+# -> module    : Solver module.
+# -> instances : Iterable of argument tuples, as returned by read_instances.
+def solve_all(module, instances):
+    for instance in instances:
+        yield module.solve(*instance)
+
+# Solves every instance of data and writes the answers to out, one per line.
+# -> problem : Name of the problem (one of PROBLEMS).
+# -> data    : Input contents, as bytes.
+# -> out     : Binary output stream. It is buffered, so the answers are not written one system call at a time.
+def run(problem, data, out):
+    module = importlib.import_module(problem)
+    for answer in solve_all(module, read_instances(module, tokenize(data))):
+        out.write(b"%d\n" % answer)
+    out.flush()
+
+def main():
+    if len(sys.argv) not in (2, 3) or sys.argv[1] not in PROBLEMS:
+        sys.exit("usage: python BATCH_RUNNER.py {%s} [FILE]" % ",".join(PROBLEMS))
+
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], "rb") as f:
+            data = f.read()
+    else:
+        data = sys.stdin.buffer.read()
+
+    run(sys.argv[1], data, sys.stdout.buffer)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+BENCHMARK
+
+Description:
+-> Times every solver path of BUS_COUNT, DANCE_DEV and JUSTIFY_WORDS on generated instances.
+-> Instances come from seeded generators, so a run with the same scale and seed always solves the same instances.
+-> Every path's answer is checked against its reference path (the original algorithm, or the path it must agree with).
+-> Results (answers and best time of each path) can be saved as a JSON baseline. A later run is compared with it:
+   it fails if an answer differs, or if a path's throughput dropped by more than the threshold.
+
+Usage:
+python BENCHMARK.py [-s SCALE] [-p PROBLEM] [-r REPEAT] [-b BASELINE] [-u] [-t THRESHOLD] [--seed SEED]
+
+SCALE     -> small (default), medium or production. Instance sizes of each scale are listed in SCALES.
+PROBLEM   -> Only benchmark this problem (can be given several times).
+REPEAT    -> Number of timed runs of each path, the best one is kept (default 5).
+BASELINE  -> JSON baseline file (default benchmark_baseline.json).
+-u        -> Write the results to the baseline file instead of comparing with it.
+THRESHOLD -> Allowed throughput drop, as a fraction of the baseline (default 0.25).
+
+Exit status: 0 if every check passed, 1 otherwise.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import random
+import string
+import sys
+import tempfile
+import time
+
+import BUS_COUNT
+import DANCE_DEV
+import JUSTIFY_WORDS
+
+# Generates a BUS_COUNT instance on a random metric graph with unique shortest paths from the office, in the arguments of
+# BUS_COUNT.solve.
+# -> rng          : random.Random used for every choice.
+# -> M            : Number of locations, including office.
+# -> max_distance : Maximum length of a road of the shortest-path tree.
+# -> max_emp      : Maximum number of employees at a location.
+# -> capacity     : Bus capacity (random if None).
+# -> density      : Probability that a pair of locations in different branches of the tree has a road between them.
+# A random tree rooted at the office is drawn first. Every road has the length of the tree path between its two locations (the tree
+# metric), so the roads satisfy the triangle inequality. Roads other than the tree's only join locations where neither is an
+# ancestor of the other: such a road (u, v) is then longer than the path from the office to v minus that to u, so it is never part
+# of a shortest path from the office, and the tree paths are the only shortest paths. A distance of 0 means there is no road.
+def bus_instance(rng, M, max_distance=299, max_emp=60, capacity=None, density=0.5):
+    parent = [-1] + [rng.randrange(v) for v in range(1, M)]
+    length = [0] + [rng.randint(1, max_distance) for _ in range(1, M)]
+
+    dist_mat = [[0] * M for _ in range(M)]
+    for u in range(M):
+        # Tree distances from u. The ancestors of u are reached by walking up from u. Any other location v is reached through its
+        # parent, which has a lower index, so one pass in index order finds them all. below[v] tells whether v is u or one of its
+        # descendants.
+        tree = [0] * M
+        ancestor = [False] * M
+        v = u
+        while parent[v] != -1:
+            tree[parent[v]] = tree[v] + length[v]
+            ancestor[parent[v]] = True
+            v = parent[v]
+        below = [False] * M
+        below[u] = True
+        for v in range(1, M):
+            if v != u and not ancestor[v]:
+                tree[v] = tree[parent[v]] + length[v]
+                below[v] = below[parent[v]]
+
+        row = dist_mat[u]
+        for v in range(u + 1, M):
+            if parent[v] == u:
+                row[v] = length[v]
+            elif not below[v] and rng.random() < density:
+                row[v] = tree[v]
+            dist_mat[v][u] = row[v]
+
+    no_of_emp = [rng.randint(0, max_emp) for _ in range(M - 1)]
+    if capacity is None:
+        capacity = rng.randint(1, max_emp)
+    return M, dist_mat, no_of_emp, capacity
+
+# Generates a DANCE_DEV instance (list of tile names), in the arguments of DANCE_DEV.solve.
+# -> rng    : random.Random used for every choice.
+# -> n      : Number of steps.
+# -> repeat : Probability that a step repeats one of the two previous tiles (routines are not uniformly random).
+def dance_instance(rng, n, repeat=0.5):
+    steps = []
+    for i in range(n):
+        if i >= 2 and rng.random() < repeat:
+            steps.append(steps[i - rng.randint(1, 2)])
+        else:
+            steps.append(rng.choice(DANCE_DEV.TILES))
+    return (steps,)
+
+# Generates a JUSTIFY_WORDS instance, in the arguments of JUSTIFY_WORDS.solve.
+# -> rng        : random.Random used for every choice.
+# -> k          : Number of words.
+# -> n          : Number of lines.
+# -> m          : Maximum width of each line.
+# -> max_length : Maximum length of a word (m if None). Some words may not fit on any line.
+def justify_instance(rng, k, n, m, max_length=None):
+    max_length = max(1, max_length or m)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(1, max_length))) for _ in range(k)]
+    return words, n, m
+
+# Solver paths that need more than one call, taking the arguments of their problem's solve.
+def bus_matrix(M, dist_mat, no_of_emp, max_emp):
+    g = BUS_COUNT.Graph(M)
+    g.graph = dist_mat
+    return BUS_COUNT.schedule_buses(g.dijkstra(0, tree=True), [0] + list(no_of_emp), max_emp)
+
+def bus_depots(M, dist_mat, no_of_emp, max_emp):
+    return BUS_COUNT.depot_bus_counts(dist_mat, no_of_emp, max_emp, depots=[0])[0][1]
+
+def bus_counter(M, dist_mat, no_of_emp, max_emp):
+    # Rebuilds the count one location at a time through update, starting with no employees.
+    counter = BUS_COUNT.BusCounter.from_instance(M, dist_mat, [0] * (M - 1), max_emp)
+    for v, x in enumerate(no_of_emp, 1):
+        counter.update(v, x)
+    return counter.bus_count
+
+def bus_cached(M, dist_mat, no_of_emp, max_emp, cache=BUS_COUNT.TreeCache(size=16)):
+    # The first timed run fills the cache, the next ones measure a warm solve.
+    return BUS_COUNT.solve(M, dist_mat, no_of_emp, max_emp, cache=cache)
+
+def dance_stream(steps):
+    stream = DANCE_DEV.DanceStream(window=64)
+    for step in steps:
+        stream.push(step)
+    stream.flush()
+    return stream.no_of_steps
+
+# Input of another format for the paths that read one, kept for the instance of the last call: name -> (instance argument, input).
+# The first timed run converts the instance, the next ones only measure the path itself.
+_inputs = {}
+
+# Returns the input name of the instance argument source, calling convert(source) only when source changes.
+def converted(name, source, convert):
+    entry = _inputs.get(name)
+    if entry is None or entry[0] is not source:
+        entry = _inputs[name] = (source, convert(source))
+    return entry[1]
+
+# Writes the instance to a temporary binary file (BUS_COUNT.write_binary), removed when the benchmark exits.
+def binary_file(instance):
+    fd, path = tempfile.mkstemp(suffix=".npy")
+    os.close(fd)
+    atexit.register(os.remove, path)
+    BUS_COUNT.write_binary(path, *instance)
+    return path
+
+def bus_binary(M, dist_mat, no_of_emp, max_emp):
+    # Reads the memory-mapped file, the NumPy matrix is then solved by array_dijkstra.
+    path = converted("bus binary", dist_mat, lambda _: binary_file((M, dist_mat, no_of_emp, max_emp)))
+    return BUS_COUNT.solve(*BUS_COUNT.read_binary(path))
+
+# Bus capacities of the capacity sweep paths. Their answer is the sum of the bus counts of all capacities.
+CAPACITIES = range(1, 61)
+
+def bus_capacity_solves(M, dist_mat, no_of_emp, max_emp):
+    return sum(BUS_COUNT.solve(M, dist_mat, no_of_emp, capacity) for capacity in CAPACITIES)
+
+def bus_capacity_sweep(M, dist_mat, no_of_emp, max_emp):
+    return sum(count for capacity, count in BUS_COUNT.capacity_bus_counts(M, dist_mat, no_of_emp, CAPACITIES))
+
+def dance_buffer(steps):
+    return DANCE_DEV.min_moves_buffer(converted("dance codes", steps, DANCE_DEV.encode_steps))
+
+def dance_text(steps):
+    text = converted("dance text", steps, lambda steps: ("%d\n%s\n" % (len(steps), "\n".join(steps))).encode())
+    return DANCE_DEV.min_moves_buffer(DANCE_DEV.read_codes(text))
+
+# (n, m) queries of the multi-query paths, around the instance's own: a quarter, half and all of the lines, half and all of the
+# width. Their answer is the sum of the answers of all queries.
+def layout_queries(n, m):
+    return [(lines, width) for lines in (n // 4, n // 2, n) for width in (m // 2, m)]
+
+def justify_solves(words, n, m):
+    return sum(JUSTIFY_WORDS.solve(words, lines, width) for lines, width in layout_queries(n, m))
+
+def justify_layouts(words, n, m):
+    return sum(JUSTIFY_WORDS.Layouts(words).queries(layout_queries(n, m)))
+
+def justify_within(words, n, m):
+    # With a generous time limit the count must be proven optimal, an unproven one is reported as -1.
+    count, proven = JUSTIFY_WORDS.solve_within(words, n, m, 60)
+    return count if proven else -1
+
+# Solver paths of each problem: (name, function of the instance arguments, name of the reference path or None, size limit).
+# A path is only timed on instances whose size (see SIZES) is at most its limit (None: no limit), for slow reference paths.
+# A path whose reference is None is only checked against the baseline answers.
+PATHS = {
+    "BUS_COUNT": [
+        # The original matrix Dijkstra starts from a distance of 500, so it is only valid within the problem's constraints (M < 12).
+        ("matrix_dijkstra", bus_matrix, None, 11 * 11),
+        ("solve", BUS_COUNT.solve, "matrix_dijkstra", None),
+        ("depot_bus_counts", bus_depots, "solve", None),
+        ("bus_counter", bus_counter, "solve", None),
+        ("tree_cache", bus_cached, "solve", None),
+        ("capacity_solves", bus_capacity_solves, None, 300 * 300),
+        ("capacity_sweep", bus_capacity_sweep, "capacity_solves", None),
+    ],
+    "DANCE_DEV": [
+        ("solve_scan", DANCE_DEV.solve_scan, None, 20000),
+        ("solve", DANCE_DEV.solve, "solve_scan", None),
+        ("min_moves", lambda steps: DANCE_DEV.min_moves(DANCE_DEV.encode_steps(steps)), "solve_scan", None),
+        ("stream", dance_stream, "solve_scan", None),
+        ("min_moves_buffer", dance_buffer, "solve", None),
+        ("read_codes", dance_text, "solve", None),
+        ("exact_min_moves", lambda steps: DANCE_DEV.exact_min_moves(DANCE_DEV.encode_steps(steps)), None, 200000),
+    ],
+    "JUSTIFY_WORDS": [
+        ("solve_search", JUSTIFY_WORDS.solve_search, None, 25),
+        ("solve", JUSTIFY_WORDS.solve, "solve_search", None),
+        ("solve_within", justify_within, "solve", None),
+        ("query_solves", justify_solves, None, 2000),
+        ("layouts", justify_layouts, "query_solves", None),
+    ],
+}
+
+# The binary input needs NumPy.
+if BUS_COUNT.np is not None:
+    PATHS["BUS_COUNT"].append(("read_binary", bus_binary, "solve", None))
+
+# Size of an instance, compared with the size limits of PATHS and used for the throughput (size units per second).
+SIZES = {
+    "BUS_COUNT": lambda M, dist_mat, no_of_emp, max_emp: M * M,
+    "DANCE_DEV": lambda steps: len(steps),
+    "JUSTIFY_WORDS": lambda words, n, m: len(words),
+}
+
+# Instances of each scale: problem -> list of (case name, generator, generator arguments after rng).
+# M11 keeps every distance below 300 (tree roads up to 25, so d[v] <= 250), as in the problem's constraints.
+SCALES = {
+    "small": {
+        "BUS_COUNT": [("M11", bus_instance, (11, 25)), ("M100", bus_instance, (100,))],
+        "DANCE_DEV": [("n50", dance_instance, (50,)), ("n10k", dance_instance, (10000,))],
+        "JUSTIFY_WORDS": [("k25", justify_instance, (25, 10, 10)), ("k200", justify_instance, (200, 40, 10))],
+    },
+    "medium": {
+        "BUS_COUNT": [("M300", bus_instance, (300,)), ("M1000", bus_instance, (1000,))],
+        "DANCE_DEV": [("n20k", dance_instance, (20000,)), ("n1M", dance_instance, (1000000,))],
+        "JUSTIFY_WORDS": [("k25", justify_instance, (25, 10, 10)), ("k2000", justify_instance, (2000, 300, 20))],
+    },
+    "production": {
+        "BUS_COUNT": [("M2000", bus_instance, (2000,))],
+        "DANCE_DEV": [("n10M", dance_instance, (10000000,))],
+        "JUSTIFY_WORDS": [("k10000", justify_instance, (10000, 1500, 40)), ("k2000m80", justify_instance, (2000, 200, 80))],
+    },
+}
+
+# Best time (seconds) and answer of repeat runs of a path.
+def measure(path, instance, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        answer = path(*instance)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, answer
+
+# Runs the benchmark and returns the results: "problem/case/path" -> {"answer", "seconds", "throughput"}.
+# Answers that differ from the reference path are reported to errors (list of messages).
+# -> scale    : Key of SCALES.
+# -> problems : Problems to benchmark.
+# -> repeat   : Number of timed runs of each path.
+# -> seed     : Seed of the generators (each case has its own random.Random, so cases do not depend on each other).
+def run(scale, problems, repeat, seed, errors, out=sys.stdout):
+    results = {}
+    for problem in problems:
+        for case, generator, args in SCALES[scale][problem]:
+            instance = generator(random.Random("%s/%s/%d" % (problem, case, seed)), *args)
+            size = SIZES[problem](*instance)
+            answers = {}
+            for name, path, reference, limit in PATHS[problem]:
+                if limit is not None and size > limit:
+                    continue
+                seconds, answer = measure(path, instance, repeat)
+                answers[name] = answer
+                key = "%s/%s/%s" % (problem, case, name)
+                results[key] = {"answer": answer, "seconds": seconds, "throughput": size / seconds if seconds else float("inf")}
+                out.write("%-45s %12.6f s %14.0f /s  answer %d\n" % (key, seconds, results[key]["throughput"], answer))
+                if reference in answers and answers[reference] != answer:
+                    errors.append("%s: answer %d, reference %s gives %d" % (key, answer, reference, answers[reference]))
+    return results
+
+# Compares results with a baseline and reports differences to errors.
+# -> threshold : Allowed throughput drop, as a fraction of the baseline throughput.
+def compare(results, baseline, threshold, errors):
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["answer"] != base["answer"]:
+            errors.append("%s: answer %d, baseline %d" % (key, result["answer"], base["answer"]))
+        if result["throughput"] < base["throughput"] * (1 - threshold):
+            errors.append("%s: throughput %.0f/s, baseline %.0f/s (-%.0f%%)"
+                          % (key, result["throughput"], base["throughput"], 100 * (1 - result["throughput"] / base["throughput"])))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every solver path against reference answers and a JSON baseline.")
+    parser.add_argument("-s", "--scale", choices=SCALES, default="small")
+    parser.add_argument("-p", "--problem", action="append", choices=PATHS, help="problem to benchmark (default: all)")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="timed runs of each path (default: 5)")
+    parser.add_argument("-b", "--baseline", default="benchmark_baseline.json", help="baseline file (default: benchmark_baseline.json)")
+    parser.add_argument("-u", "--update", action="store_true", help="write the results to the baseline file")
+    parser.add_argument("-t", "--threshold", type=float, default=0.25, help="allowed throughput drop (default: 0.25)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generators (default: 0)")
+    args = parser.parse_args()
+
+    errors = []
+    results = run(args.scale, args.problem or list(PATHS), args.repeat, args.seed, errors)
+
+    # Baselines of all scales and seeds share one file, each under its own key.
+    try:
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    except FileNotFoundError:
+        baselines = {}
+    name = "%s/seed=%d" % (args.scale, args.seed)
+
+    if args.update:
+        baselines.setdefault(name, {}).update(results)
+        baselines["machine"] = {"python": platform.python_version(), "platform": platform.platform()}
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+    elif name in baselines:
+        compare(results, baselines[name], args.threshold, errors)
+    else:
+        print("no baseline for %s in %s" % (name, args.baseline))
+
+    for error in errors:
+        print("FAIL " + error)
+    sys.exit(1 if errors else 0)
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,11 @@ M lines consits of M integers seperated by space -> distance matrix.
 M-1 space seperated integers                     -> Number of employees at each location, except office.
 An integer representing maximum number of people that can travel in bus at 1 time.
 
+Binary input (python BUS_COUNT.py FILE):
+FILE is a .npy file holding a 1-D int32 array, or a raw file of little-endian int32 values, with the same numbers in this order:
+M, maximum number of people in a bus, the M-1 employee counts, then the M * M distance matrix row by row.
+The file is memory-mapped and the matrix is used in place (no parsing, no copy). write_binary converts an instance.
+
 Output:
 Minimum number of buses required to pick up all employees to the office.
 
@@ -66,28 +71,52 @@ Location 3: (11) -> 11 -> 11 + remaining 2 at location 2 is picked up along the
 Thus, 4 buses are required to pick up all employees to the office.
 """
 
-# Number of vertices (or locations) in the graph.
-M = int(input())
-# Adjacency matrix, representing distances between vertices.
-dist_mat = []
-for i in range(M):
-    # Takes a space-separated row of integers as input, representing distances from one vertex to others.
-    a = list(map(int, input().split()))
-    dist_mat.append(a)
-# List of integers representing the number of employees at each vertex (location), except at office.
-no_of_emp = list(map(int, input().split()))
-# The maximum number of employees a bus can carry at one time.
-max_emp = int(input())
+import hashlib
+import heapq
+import math
+import os
+import sys
+from array import array
+from collections import OrderedDict
+
+from STATS import phase
+
+# NumPy is only needed by the batched all-pairs mode (all_pairs_shortest_paths / depot_bus_counts), the on-disk tree cache and the binary input.
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Dijkstra's algotithm to find the shortest route from each location to the office.
 class Graph:
-    def __init__(self, vertices):
+    # -> vertices : Number of vertices in the graph.
+    # -> dense    : If False, the adjacency matrix is not allocated and the edges are given with add_edge instead (sparse graphs with thousands of vertices).
+    def __init__(self, vertices, dense=True):
         # Stores the number of vertices in the graph.
         self.v = vertices
         # Creates a 2D list (matrix) of size vertices × vertices initialized with 0. This matrix will later store the adjacency matrix.
-        self.graph = [[0 for column in range(vertices)] for row in range(vertices)]
+        self.graph = [[0 for column in range(vertices)] for row in range(vertices)] if dense else None
+        # Adjacency lists of (neighbour, distance) pairs, filled by add_edge. None while the graph is only described by the matrix.
+        self.adj = None
+
+    # Adds a road of the given distance between vertex u and vertex v. Roads are two-way, so the edge is stored in both adjacency lists.
+    def add_edge(self, u, v, distance):
+        if self.adj is None:
+            self.adj = [[] for _ in range(self.v)]
+        self.adj[u].append((v, distance))
+        self.adj[v].append((u, distance))
+
+    # -> source : The vertex (office) the shortest paths start from.
+    # -> mode   : "matrix" runs the original O(V²) scan, "heap" runs heap_dijkstra. Both return the same paths.
+    # -> tree   : If True, returns a ShortestPathTree (parent and depth arrays) instead of a list with one path list per vertex.
+    # -> stats  : Optional statistics object, passed on to heap_dijkstra (heap mode only).
+    def dijkstra(self, source, mode="matrix", tree=False, stats=None):
+        if mode == "heap":
+            dist, pred = self.heap_dijkstra(source, stats)
+            if tree:
+                return ShortestPathTree(pred, dist)
+            return [self.reconstruct_path(pred, i) for i in range(self.v)]
 
-    def dijkstra(self, source):
         # List to store the shortest distances from the source (office) to all vertices.
         # Initialized to the largest value (500) for all vertices, except the source (office), which is set to 0.
         dist = [500] * self.v
@@ -120,6 +149,10 @@ class Graph:
                     # full path from the source (office) to any vertex.
                     pred[v] = u 
 
+        # Returns the compact tree instead of materializing every path.
+        if tree:
+            return ShortestPathTree(pred, dist)
+
         # Creates an empty list, paths, which will store the reconstructed paths for all vertices in the graph.
         paths = []
 
@@ -134,6 +167,96 @@ class Graph:
         # Returns the list paths, which now contains the shortest paths from the source (office) vertex to all other vertices.
         return paths
 
+    # Dijkstra's algorithm with a binary heap (priority queue) instead of the linear scan done by shortest_distance_vertex.
+    # Stale heap entries are not removed when a distance improves, they are skipped when popped (lazy deletion).
+    # Works on the adjacency lists (add_edge) if present, otherwise on the adjacency matrix. Runs in O(E log V).
+    # Returns the distance list (math.inf for unreachable vertices, no upper limit on distances) and the predecessor list.
+    # Vertices with equal distance are popped in increasing index order, the same order as shortest_distance_vertex, so pred is identical to the matrix mode.
+    # -> stats : Optional statistics object (INSTRUMENT.Stats), receives the numbers of heap pops, stale pops and relaxations.
+    def heap_dijkstra(self, source, stats=None):
+        if self.adj is None and np is not None and isinstance(self.graph, np.ndarray):
+            return self.array_dijkstra(source, stats)
+
+        dist = [math.inf] * self.v
+        dist[source] = 0
+        pred = [-1] * self.v
+        # Same meaning as shortest_path_tree in dijkstra: True once the vertex's distance is final.
+        done = [False] * self.v
+        # Heap of (distance, vertex) entries.
+        heap = [(0, source)]
+        # Counted in locals and reported once, so the loop costs the same with or without stats.
+        pops = 0
+        stale = 0
+        relaxations = 0
+
+        while heap:
+            d, u = heapq.heappop(heap)
+            pops += 1
+            # Stale entry: u was already processed with a shorter distance.
+            if done[u]:
+                stale += 1
+                continue
+            done[u] = True
+
+            # Neighbours of u as (vertex, distance) pairs. A distance of 0 in the matrix means there is no road.
+            if self.adj is not None:
+                edges = self.adj[u]
+            else:
+                edges = ((v, w) for v, w in enumerate(self.graph[u]) if w > 0)
+
+            for v, w in edges:
+                if not done[v] and d + w < dist[v]:
+                    dist[v] = d + w
+                    pred[v] = u
+                    relaxations += 1
+                    heapq.heappush(heap, (dist[v], v))
+
+        if stats is not None:
+            stats.add("heap pops", pops)
+            stats.add("stale pops", stale)
+            stats.add("relaxations", relaxations)
+            # Every relaxation pushes one entry, and the source was pushed first.
+            stats.add("heap pushes", relaxations + 1)
+        return dist, pred
+
+    # Same as heap_dijkstra for a NumPy distance matrix (binary input): the row of each popped vertex is relaxed in one vectorized step,
+    # and only the improved vertices are handled in Python. The matrix is only read, so a memory-mapped matrix is never copied.
+    # Returns the distance list (floats, math.inf for unreachable vertices) and the predecessor list.
+    def array_dijkstra(self, source, stats=None):
+        dist = np.full(self.v, np.inf)
+        dist[source] = 0
+        pred = [-1] * self.v
+        done = np.zeros(self.v, dtype=bool)
+        heap = [(0.0, source)]
+        pops = 0
+        stale = 0
+        relaxations = 0
+
+        while heap:
+            d, u = heapq.heappop(heap)
+            pops += 1
+            if done[u]:
+                stale += 1
+                continue
+            done[u] = True
+
+            row = self.graph[u]
+            # A distance of 0 means there is no road. Improved vertices come out in increasing index order, as in heap_dijkstra.
+            through = d + row
+            improved = np.flatnonzero((row > 0) & ~done & (through < dist))
+            dist[improved] = through[improved]
+            for v, dv in zip(improved.tolist(), through[improved].tolist()):
+                pred[v] = u
+                heapq.heappush(heap, (dv, v))
+            relaxations += len(improved)
+
+        if stats is not None:
+            stats.add("heap pops", pops)
+            stats.add("stale pops", stale)
+            stats.add("relaxations", relaxations)
+            stats.add("heap pushes", relaxations + 1)
+        return dist.tolist(), pred
+
     # This function finds the vertex with the smallest known distance that hasn't been processed yet. It is used in Dijkstra's algorithm to decide the next vertex to 
     # process.
     # -> dist               : A list of the current shortest distances from the source (office) to all vertices.
@@ -164,111 +287,448 @@ class Graph:
 
         # Use a while loop to trace the path backward. The loop continues until vertex is -1, which indicates the source vertex has been reached.
         while vertex != -1:
-            # Insert the current vertex at the beginning of the path.
-            path.insert(0, vertex)
+            # Append the current vertex, the path is built backwards (target to source) and reversed once at the end.
+            path.append(vertex)
             # Update vertex to its predecessor (pred[vertex]).
             vertex = pred[vertex]
+        path.reverse()
 
         # Return the reconstructed path, which is now a list of vertices forming the shortest path from the source (office) to the target.
         return path
 
-# This function identifies the index of the longest path (in terms of the number of vertices) from the list of paths.
-# -> path : A list where each element is a path (list of vertices).
-def find_max(paths):
-    # Start by assuming the longest path is at index 0.
-    max_index = 0
-
-    # For each path in paths (starting from index 1).
-    for i in range(1, len(paths)):
-
-        # Compare the length of the current path with the length of the path at max_index.
-        if len(paths[i]) > len(paths[max_index]):
-            max_index = i
-
-    # Return max_index, which is the index of the longest path.
-    return max_index
-
-# A Graph object is created with M vertices.
-g = Graph(M)
-# The adjacency matrix dist_mat (input representing distances between vertices) is assigned to g.graph.
-g.graph = dist_mat
-
-
-# The dijkstra(0) method is called to compute the shortest paths from the source (office) to all vertices. 
-# Paths now contains the reconstructed paths from the office to each location.
-paths = g.dijkstra(0)
-
-# The path to the office itself (index 0) is removed from paths because it is not needed.
-paths.pop(0)
-
-# Tracks the total number of bus trips required.
-bus_count = 0
-# Tracks the number of locations (other than the office) processed
-k = 0
-
-# The loop continues until all M-1 non-office locations are processed.
-while k < M-1:
-    # Step 1: Find the Longest Path:
-    # returns the index of the path with the most vertices (longest route). This ensures buses take the most efficient route covering multiple locations.
-    max_index = find_max(paths)
-    # The path is adjusted to exclude the office (first vertex) and the destination location (last vertex) using [1:-1].
-    route = paths[max_index][1:-1]
-
-    # Step 2: Transport Employees at max_index:
-    # Case 1: Employees Fit in One Bus:
-    # If the employees at the location indexed by max_index exceed or equal the bus capacity (max_emp).
-    if no_of_emp[max_index] >= max_emp:
-        # Subtract max_emp from no_of_emp[max_index].
-        no_of_emp[max_index] -= max_emp
-        # Increment the bus trip counter by 1.
-        bus_count += 1
-
-    # Case 2: Employees Fit in Part of a Bus:
-    # If the number of employees is less than the bus capacity.
+# Shortest-path tree stored as a parent array and a depth array, instead of one path list per vertex.
+# -> pred : The predecessor list returned by Graph.dijkstra / Graph.heap_dijkstra (-1 for the source and for unreachable vertices).
+# -> dist : Optional distance list, kept as is.
+# depth[v] is the number of edges between v and the source, so depth[v] + 1 == len(path) of the list representation.
+class ShortestPathTree:
+    def __init__(self, pred, dist=None):
+        n = len(pred)
+        self.parent = array('i', pred)
+        self.dist = dist
+        self.depth = array('i', [-1]) * n
+
+        parent = self.parent
+        depth = self.depth
+        for v in range(n):
+            # Walks up until a vertex with a known depth (or the root) is found, then assigns the depths on the way back down.
+            stack = []
+            u = v
+            while u != -1 and depth[u] == -1:
+                stack.append(u)
+                u = parent[u]
+            d = -1 if u == -1 else depth[u]
+            while stack:
+                d += 1
+                depth[stack.pop()] = d
+
+        # Children lists in compressed form: the children of v are children[first[v]:first[v + 1]].
+        self.first = array('i', [0]) * (n + 1)
+        for v in range(n):
+            if parent[v] != -1:
+                self.first[parent[v] + 1] += 1
+        for v in range(n):
+            self.first[v + 1] += self.first[v]
+        self.children = array('i', [0]) * self.first[n]
+        fill = self.first[:n]
+        for v in range(n):
+            if parent[v] != -1:
+                self.children[fill[parent[v]]] = v
+                fill[parent[v]] += 1
+
+    def __len__(self):
+        return len(self.parent)
+
+    # Lazily yields the ancestors of vertex v, from its parent up to the source. Nothing is copied.
+    def ancestors(self, v):
+        v = self.parent[v]
+        while v != -1:
+            yield v
+            v = self.parent[v]
+
+    # Returns the path from the source to v as a list, same as Graph.reconstruct_path.
+    def path(self, v):
+        path = [v]
+        path.extend(self.ancestors(v))
+        path.reverse()
+        return path
+
+    # Yields v and every vertex whose shortest path passes through v (depth-first order).
+    def subtree(self, v):
+        stack = [v]
+        while stack:
+            u = stack.pop()
+            yield u
+            stack.extend(self.children[self.first[u]:self.first[u + 1]])
+
+# Greedy bus scheduler: locations are handled deepest route first, using a bucket queue indexed by tree depth (O(V) overall).
+# -> tree      : ShortestPathTree rooted at the office.
+# -> employees : Number of employees at each vertex, indexed by vertex (the office's own entry is ignored).
+# -> max_emp   : Bus capacity.
+# At each location, the free seats of the partly filled buses coming from deeper locations on routes through it are used first.
+# The remaining employees leave in count // max_emp full buses, plus one partly filled bus whose free seats are carried towards the office.
+# -> stats     : Optional statistics object, receives the numbers of full and partly filled bus trips and of queue operations.
+def schedule_buses(tree, employees, max_emp, stats=None):
+    parent = tree.parent
+    depth = tree.depth
+
+    # Bucket queue: buckets[d] holds the locations whose route to the office has d edges.
+    buckets = [[] for _ in range(max(depth, default=0) + 1)]
+    for v in range(len(parent)):
+        # Depth 0 is the office (or a location without route), nothing to pick up there.
+        if depth[v] > 0:
+            buckets[depth[v]].append(v)
+
+    # Free seats of the buses that pass through each vertex, collected from deeper locations.
+    free = [0] * len(parent)
+    bus_count = 0
+    partial = 0
+
+    for d in range(len(buckets) - 1, 0, -1):
+        for v in buckets[d]:
+            # Employees still waiting after the passing buses filled their free seats.
+            waiting = employees[v] - free[v]
+            if waiting <= 0:
+                # Every employee fits in the passing buses, the unused seats go on towards the office.
+                free[parent[v]] += -waiting
+                continue
+            # Full buses are counted at once, and a partly filled bus is added for the rest.
+            full, rest = divmod(waiting, max_emp)
+            bus_count += full
+            if rest:
+                bus_count += 1
+                partial += 1
+                free[parent[v]] += max_emp - rest
+
+    if stats is not None:
+        stats.add("bus trips", bus_count)
+        stats.add("partial bus trips", partial)
+        # Every location with a route is pushed into and popped from the bucket queue once.
+        queued = sum(len(bucket) for bucket in buckets)
+        stats.add("queue pushes", queued)
+        stats.add("queue pops", queued)
+    return bus_count
+
+# schedule_buses for many bus capacities at once, vectorized with NumPy. Returns an array with the bus count of each capacity.
+# -> tree       : ShortestPathTree rooted at the office.
+# -> employees  : Number of employees at each vertex, indexed by vertex (the office's own entry is ignored).
+# -> capacities : Bus capacities (at least 1 each).
+# The tree and the depth order are the same for every capacity, so the locations are handled one depth level at a time (deepest
+# first), with one row of free seats per location and one column per capacity. Each level is a few array operations.
+def schedule_buses_sweep(tree, employees, capacities):
+    if np is None:
+        raise ImportError("schedule_buses_sweep requires NumPy")
+    capacities = np.asarray(capacities, dtype=np.int64)
+    if (capacities < 1).any():
+        raise ValueError("capacities must be at least 1")
+
+    parent = np.asarray(tree.parent, dtype=np.intp)
+    depth = np.asarray(tree.depth)
+    employees = np.asarray(employees, dtype=np.int64)
+    # Free seats of the buses that pass through each vertex, for each capacity.
+    free = np.zeros((len(parent), len(capacities)), dtype=np.int64)
+    bus_count = np.zeros(len(capacities), dtype=np.int64)
+
+    # Locations sorted by depth, level d is order[start[d]:start[d + 1]].
+    order = np.argsort(depth, kind="stable")
+    start = np.searchsorted(depth[order], np.arange(int(depth.max(initial=0)) + 2))
+    for d in range(len(start) - 2, 0, -1):
+        level = order[start[d]:start[d + 1]]
+        waiting = employees[level, None] - free[level]
+        # Buses needed (rounded up) and free seats passed on: the unused seats of the passing buses, or those of the last bus.
+        buses = np.maximum(-(-waiting // capacities), 0)
+        seats = np.where(waiting > 0, -waiting % capacities, -waiting)
+        bus_count += buses.sum(axis=0)
+        # Several locations of a level can share a parent, their seats are added with np.add.at.
+        np.add.at(free, parent[level], seats)
+
+    return bus_count
+
+# Bus count for each capacity of a list, computing the shortest-path tree only once.
+# -> M          : Number of locations, including office.
+# -> dist_mat   : M × M distance matrix.
+# -> no_of_emp  : Number of employees at each location, except office.
+# -> capacities : Bus capacities.
+# -> cache      : Optional TreeCache.
+# Returns a list of (capacity, bus count) pairs.
+def capacity_bus_counts(M, dist_mat, no_of_emp, capacities, cache=None):
+    if cache is not None:
+        tree = cache.tree(dist_mat)
+    else:
+        g = Graph(M)
+        g.graph = dist_mat
+        tree = g.dijkstra(0, mode="heap", tree=True)
+    counts = schedule_buses_sweep(tree, [0] + list(no_of_emp), capacities)
+    return list(zip(capacities, counts.tolist()))
+
+# Bus count that is kept up to date while the numbers of employees change and the roads stay the same.
+# -> tree      : ShortestPathTree rooted at the office.
+# -> employees : Number of employees at each vertex, indexed by vertex (the office's own entry is ignored).
+# -> max_emp   : Bus capacity.
+# The result of schedule_buses only depends, at each location, on its employees and on the free seats coming from its children:
+# buses[v] and seats[v] (free seats that v passes on to its parent) are a function of employees[v] and free[v] (sum of seats of
+# the children). A change at one location can only change these values along its route to the office, so update walks up that
+# route and stops as soon as the free seats passed on do not change: O(depth) per update instead of a full recompute.
+class BusCounter:
+    def __init__(self, tree, employees, max_emp):
+        n = len(tree)
+        self.tree = tree
+        self.max_emp = max_emp
+        self.employees = list(employees)
+        self.free = [0] * n
+        self.seats = [0] * n
+        self.buses = [0] * n
+        self.bus_count = 0
+
+        # Deepest locations first, so every child is done before its parent (same order as schedule_buses).
+        depth = tree.depth
+        for v in sorted(range(n), key=depth.__getitem__, reverse=True):
+            if depth[v] > 0:
+                self.bus_count += self.refresh(v)
+
+    # Builds the counter for one instance, in the input format of solve.
+    @classmethod
+    def from_instance(cls, M, dist_mat, no_of_emp, max_emp):
+        g = Graph(M)
+        g.graph = dist_mat
+        return cls(g.dijkstra(0, mode="heap", tree=True), [0] + list(no_of_emp), max_emp)
+
+    # Recomputes buses[v] and seats[v] from employees[v] and free[v], adds the change of seats[v] to the parent's free seats.
+    # Returns the change of the number of buses at v.
+    def refresh(self, v):
+        waiting = self.employees[v] - self.free[v]
+        if waiting <= 0:
+            # Every employee fits in the passing buses, the unused seats go on towards the office.
+            buses = 0
+            seats = -waiting
+        else:
+            full, rest = divmod(waiting, self.max_emp)
+            buses = full + (1 if rest else 0)
+            seats = self.max_emp - rest if rest else 0
+        self.free[self.tree.parent[v]] += seats - self.seats[v]
+        self.seats[v] = seats
+        change = buses - self.buses[v]
+        self.buses[v] = buses
+        return change
+
+    # Sets the number of employees at location v to x and returns the new minimum bus count.
+    def update(self, v, x):
+        self.employees[v] = x
+        # The office and locations without a route to it need no bus.
+        if self.tree.depth[v] <= 0:
+            return self.bus_count
+        parent = self.tree.parent
+        while v != -1 and self.tree.depth[v] > 0:
+            seats = self.seats[v]
+            self.bus_count += self.refresh(v)
+            if self.seats[v] == seats:
+                # The parent's free seats did not change, nothing above v changes either.
+                break
+            v = parent[v]
+        return self.bus_count
+
+# Cache of shortest-path trees, keyed by a digest of the distance matrix and the source.
+# -> size      : Maximum number of trees kept in memory (least recently used ones are dropped first).
+# -> directory : Optional directory where the pred and dist arrays are also stored as .npy files (requires NumPy).
+# A tree that is not in memory is loaded from the directory with memory mapping, and only computed (heap Dijkstra) if it is
+# not there either. Files are written under a temporary name and renamed, so concurrent jobs never read a partial file.
+class TreeCache:
+    def __init__(self, size=128, directory=None):
+        if directory is not None and np is None:
+            raise ImportError("the on-disk tree cache requires NumPy")
+        self.size = size
+        self.directory = directory
+        self.trees = OrderedDict()
+        # Number of trees found in memory, loaded from disk and computed.
+        self.hits = 0
+        self.loads = 0
+        self.misses = 0
+
+    # Digest of a distance matrix: SHA-256 of its size and its entries as 64-bit integers.
+    @staticmethod
+    def digest(dist_mat):
+        h = hashlib.sha256(array('q', [len(dist_mat)]).tobytes())
+        if np is not None and isinstance(dist_mat, np.ndarray):
+            # Same bytes as the rows below, without iterating over the entries.
+            h.update(np.ascontiguousarray(dist_mat, dtype=np.int64).tobytes())
+            return h.hexdigest()
+        for row in dist_mat:
+            h.update(array('q', row).tobytes())
+        return h.hexdigest()
+
+    # Returns the ShortestPathTree of dist_mat rooted at source.
+    def tree(self, dist_mat, source=0):
+        key = (self.digest(dist_mat), source)
+        tree = self.trees.get(key)
+        if tree is not None:
+            self.hits += 1
+            self.trees.move_to_end(key)
+            return tree
+
+        tree = self.load(key)
+        if tree is not None:
+            self.loads += 1
+        else:
+            self.misses += 1
+            g = Graph(len(dist_mat))
+            g.graph = dist_mat
+            dist, pred = g.heap_dijkstra(source)
+            tree = ShortestPathTree(pred, dist)
+            self.store(key, pred, dist)
+
+        self.trees[key] = tree
+        if len(self.trees) > self.size:
+            self.trees.popitem(last=False)
+        return tree
+
+    # File names of the pred and dist arrays of a key.
+    def paths(self, key):
+        name = os.path.join(self.directory, "%s-%d" % key)
+        return name + ".pred.npy", name + ".dist.npy"
+
+    # Loads a tree from the directory (memory-mapped arrays), None if it is not stored.
+    def load(self, key):
+        if self.directory is None:
+            return None
+        pred_path, dist_path = self.paths(key)
+        try:
+            pred = np.load(pred_path, mmap_mode="r")
+            dist = np.load(dist_path, mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        return ShortestPathTree(pred.tolist(), dist)
+
+    # Stores the pred and dist arrays of a key in the directory.
+    def store(self, key, pred, dist):
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for path, values in zip(self.paths(key), (np.array(pred, dtype=np.int32), np.array(dist, dtype=np.float64))):
+            temporary = "%s.%d.tmp" % (path, os.getpid())
+            with open(temporary, "wb") as f:
+                np.save(f, values)
+            os.replace(temporary, path)
+
+# Floyd-Warshall over the whole distance matrix, vectorized with NumPy: each of the M rounds is one min-plus update of the full matrix.
+# -> dist_mat : M × M distance matrix (0 outside the diagonal means there is no road).
+# Returns (dist, pred), both M × M arrays: row s holds the distances and the predecessor list of a shortest-path tree rooted at s.
+# With unique shortest paths (see the problem statement) row s of pred is the same as the pred list of Graph.dijkstra(s).
+def all_pairs_shortest_paths(dist_mat):
+    if np is None:
+        raise ImportError("all_pairs_shortest_paths requires NumPy")
+
+    dist = np.array(dist_mat, dtype=np.float64)
+    n = len(dist)
+    # Missing roads become infinite distances.
+    dist[dist <= 0] = np.inf
+    np.fill_diagonal(dist, 0)
+    # pred[s, v] = s for every direct road, -1 on the diagonal and for unreachable pairs.
+    pred = np.where(np.isfinite(dist), np.arange(n)[:, None], -1)
+    np.fill_diagonal(pred, -1)
+
+    for k in range(n):
+        # Distance from every s to every v through k. Row k and column k do not change in this round, so the update can be done in place.
+        via = dist[:, k, None] + dist[None, k, :]
+        better = via < dist
+        dist[better] = via[better]
+        # The last edge of the path s -> k -> v is the last edge of the path k -> v.
+        pred[better] = np.broadcast_to(pred[k], pred.shape)[better]
+
+    return dist, pred
+
+# Bus count for each candidate office (depot), using one all-pairs computation instead of one Dijkstra run per depot.
+# -> dist_mat  : M × M distance matrix.
+# -> no_of_emp : Number of employees at locations 1 .. M-1, as in the input (location 0 has none).
+# -> max_emp   : Bus capacity.
+# -> depots    : Candidate offices, all M vertices if None.
+# Returns a list of (depot, bus count) pairs. Employees living at the depot itself need no bus.
+def depot_bus_counts(dist_mat, no_of_emp, max_emp, depots=None):
+    dist, pred = all_pairs_shortest_paths(dist_mat)
+    employees = [0] + list(no_of_emp)
+    if depots is None:
+        depots = range(len(dist))
+
+    counts = []
+    for depot in depots:
+        tree = ShortestPathTree(pred[depot].tolist(), dist[depot])
+        counts.append((depot, schedule_buses(tree, employees, max_emp)))
+    return counts
+
+# Reads one instance from an iterator of whitespace-separated tokens (str or bytes), in the input format described above.
+# Returns the arguments of solve as a tuple.
+def read_instance(tokens):
+    # Number of vertices (or locations) in the graph.
+    M = int(next(tokens))
+    # Adjacency matrix, representing distances between vertices. Each row holds the distances from one vertex to the others.
+    dist_mat = [[int(next(tokens)) for _ in range(M)] for _ in range(M)]
+    # List of integers representing the number of employees at each vertex (location), except at office.
+    no_of_emp = [int(next(tokens)) for _ in range(M - 1)]
+    # The maximum number of employees a bus can carry at one time.
+    max_emp = int(next(tokens))
+    return M, dist_mat, no_of_emp, max_emp
+
+# Reads a binary instance (see Binary input above) and returns the arguments of solve as a tuple.
+# -> path : .npy file (loaded with mmap_mode="r") or raw little-endian int32 file (numpy.memmap).
+# The distance matrix is a read-only M × M view of the mapped file.
+def read_binary(path):
+    if np is None:
+        raise ImportError("the binary input requires NumPy")
+    if path.endswith(".npy"):
+        data = np.load(path, mmap_mode="r")
+        if data.dtype != np.int32 or data.ndim != 1:
+            raise ValueError("expected a 1-D int32 array, found %s %s" % (data.ndim, data.dtype))
+    else:
+        data = np.memmap(path, dtype="<i4", mode="r")
+    if len(data) < 2:
+        raise ValueError("missing header")
+    M = int(data[0])
+    max_emp = int(data[1])
+    if M < 1 or len(data) != 2 + (M - 1) + M * M:
+        raise ValueError("expected %d values for M = %d, found %d" % (2 + (M - 1) + M * M, M, len(data)))
+    no_of_emp = data[2:M + 1].tolist()
+    dist_mat = data[M + 1:].reshape(M, M)
+    return M, dist_mat, no_of_emp, max_emp
+
+# Writes an instance in the binary format.
+# -> path : Output file, written as .npy if the name ends with .npy, as raw little-endian int32 values otherwise.
+def write_binary(path, M, dist_mat, no_of_emp, max_emp):
+    if np is None:
+        raise ImportError("the binary input requires NumPy")
+    data = np.concatenate(([M, max_emp], np.asarray(no_of_emp).ravel(), np.asarray(dist_mat).ravel())).astype("<i4")
+    if path.endswith(".npy"):
+        np.save(path, data)
     else:
-        # Compute the remaining capacity (max_emp - no_of_emp[max_index]).
-        remaining = max_emp - no_of_emp[max_index]
-        # Set the employee count at this location to 0.
-        no_of_emp[max_index] = 0
-
-        # Transport Employees Along the Route:
-        # If the route contains intermediate locations (len(route) != 0)
-        if len(route) != 0:
-
-            for i in route:
-
-                # If there is no remaining capacity (remaining == 0), exit the loop.
-                if remaining == 0:
-                    break
-
-                # If employees at location i-1 fit into the remaining capacity
-                if no_of_emp[i-1] <= remaining:
-                    # Reduce the remaining capacity by the employee count.
-                    remaining -= no_of_emp[i-1]
-                    # Set no_of_emp[i-1] to 0.
-                    no_of_emp[i-1] = 0
-
-                else:
-                    # Reduce the employee count at i-1 by the remaining capacity.
-                    no_of_emp[i-1] -= remaining
-                    # Set the remaining capacity to 0.
-                    remaining = 0
-                    # Increment the bus trip counter by 1.
-                    bus_count += 1
-
-        # No Route Case:
+        data.tofile(path)
+
+# Minimum number of buses for one instance.
+# -> M         : Number of locations, including office.
+# -> dist_mat  : M × M distance matrix.
+# -> no_of_emp : Number of employees at each location, except office.
+# -> max_emp   : Bus capacity.
+# -> cache     : Optional TreeCache, the shortest-path phase is skipped for a known distance matrix.
+# -> stats     : Optional statistics object, receives the counters and the "shortest paths" and "allocation" phase times.
+def solve(M, dist_mat, no_of_emp, max_emp, cache=None, stats=None):
+    with phase(stats, "shortest paths"):
+        if cache is not None:
+            tree = cache.tree(dist_mat)
         else:
-            # If there are no intermediate locations in the route, increment the bus trip counter by 1.
-            bus_count += 1
-
-    # Step 3: Update Processed Location:
-    # If all employees at the max_index location are transported
-    if no_of_emp[max_index] == 0:
-        # Remove the path from paths and the corresponding employee count from no_of_emp.
-        paths.pop(max_index)
-        no_of_emp.pop(max_index)
-        # Increment k (processed location count).
-        k += 1
-
-print(bus_count)
-    
\ No newline at end of file
+            # A Graph object is created with M vertices.
+            g = Graph(M)
+            # The adjacency matrix dist_mat (input representing distances between vertices) is assigned to g.graph.
+            g.graph = dist_mat
+
+            # The dijkstra(0) method is called to compute the shortest-path tree from the source (office) to all vertices.
+            tree = g.dijkstra(0, mode="heap", tree=True, stats=stats)
+
+    with phase(stats, "allocation"):
+        # The office has no employees to pick up, the list is shifted so that it is indexed by vertex.
+        return schedule_buses(tree, [0] + list(no_of_emp), max_emp, stats)
+
+# Reads the text input from standard input, or the binary file given as argument.
+def main():
+    if len(sys.argv) > 1:
+        print(solve(*read_binary(sys.argv[1])))
+    else:
+        print(solve(*read_instance(iter(sys.stdin.read().split()))))
+
+if __name__ == "__main__":
+    main()
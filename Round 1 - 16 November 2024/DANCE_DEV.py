@@ -51,70 +51,468 @@ down         down        right         2
 Thus, 2 steps are taken from the initial position
 """
 
-# Number of steps or positions provided in the input sequence.
-n = int(input())
-# Steps or positions.
-steps = []
-for i in range(n):
-	steps.append(input().strip())
-     
-# Initializes the 1st and 2nd position in the steps list as the initial position of the left and right leg, respectively.
-left = steps[0]
-right = steps[1]
-# Initializes the counter for the number of leg position updates (no_of_steps) to 0.
-no_of_steps = 0
-
-# Removes the 1st and 2nd position from the steps list as it has been assigned to the left and right leg, respectively.
-steps.pop(0)
-steps.pop(0)
-
-# A flag variable used to check if a valid update for leg position has been made during the inner loop.
-flag = 0
-
-# Iterates over each position in the remaining steps list with both its index (i) and value (value).
-for i, value in enumerate(steps):
-
-    # Checks if the current step (value) doesn't match the current positions of either the left leg (left) or the right leg (right).
-    # no_of_steps is updated only if neither left nor right leg is in the same position as the current step (value)
-    if left != value and right != value:
-
-        # Iterates through the remaining steps (starting from the current position i) to check for a future match for either leg.
-        for j, values in enumerate(steps[i:]):
-
-            # Checks if the left leg's current position matches a future step (values).
-            if left == values:
-                # Updates the right leg to the current step's position (value).
+import math
+import mmap
+import os
+import sys
+from array import array
+from collections import deque
+from functools import lru_cache
+from itertools import combinations_with_replacement
+
+from STATS import phase
+
+# NumPy is only needed by the exact multi-leg engine (exact_min_moves).
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Tile names and their ids. The linear solver works on tile ids instead of strings.
+TILES = ("up", "down", "right", "left")
+TILE_IDS = {tile: i for i, tile in enumerate(TILES)}
+TILE_IDS.update({tile.encode(): i for i, tile in enumerate(TILES)})
+
+# Converts a list of tile names (str or bytes) into a bytearray of tile ids (one byte per step).
+def encode_steps(steps):
+    try:
+        return bytearray([TILE_IDS[step] for step in steps])
+    except KeyError as e:
+        raise ValueError("unknown tile: %r" % (e.args[0],)) from None
+
+# Every tile name is replaced by its tile id as an ASCII digit (bytes.replace, in C). Valid text is then only whitespace and digits,
+# one digit per token. Deleting everything but the digits and translating them gives the tile ids (one bytes.translate call).
+DIGITS = bytes(ord("0") + tile for tile in range(len(TILES)))
+KEEP_DIGITS = bytes(b for b in range(256) if b not in DIGITS)
+DIGIT_IDS = bytes.maketrans(DIGITS, bytes(range(len(TILES))))
+NAME_DIGITS = [(tile.encode(), DIGITS[i:i + 1]) for i, tile in enumerate(TILES)]
+# Translates whitespace into b" ", digits into b"x" and every other byte into b"!", for checking the replaced text.
+WHITESPACE = b" \t\n\r\x0b\x0c"
+SPACES = [WHITESPACE[i:i + 1] for i in range(len(WHITESPACE))]
+TOKEN_CLASSES = bytes.maketrans(bytes(range(256)), bytes(ord(" ") if b in WHITESPACE else ord("x") if b in DIGITS else ord("!") for b in range(256)))
+# Size of the pieces in which memory-mapped input is translated.
+CHUNK_SIZE = 1 << 24
+
+# Converts instruction text (tile names separated by whitespace) into a bytearray of tile ids.
+# -> data  : bytes, bytearray or mmap. It is translated in chunks of about CHUNK_SIZE bytes, so a memory-mapped file is never copied
+#            as a whole. Chunks end at whitespace, so that no tile name is cut in two.
+# -> start : Offset of the first tile name in data.
+# After the replacement, a byte that is neither whitespace nor a digit (unknown or misspelt name) or two digits in a row (names
+# without whitespace between them) make the text invalid, and ValueError names the first invalid token. Tokens are thus checked
+# exactly as encode_steps checks them, at the speed of a few passes over the bytes.
+def encode_text(data, start=0):
+    codes = bytearray()
+    offset = start
+    while offset < len(data):
+        end = offset + CHUNK_SIZE
+        if end < len(data):
+            # The chunk ends after its last whitespace (or at the end of data if a token is longer than the chunk).
+            end = max(data.rfind(space, offset, end) for space in SPACES) + 1 or len(data)
+        chunk = data[offset:end]
+        # Digits in the input itself would be taken for tile names.
+        if any(digit in chunk for name, digit in NAME_DIGITS):
+            invalid_token(data, start)
+        for name, digit in NAME_DIGITS:
+            chunk = chunk.replace(name, digit)
+        classes = chunk.translate(TOKEN_CLASSES)
+        if b"!" in classes or b"xx" in classes:
+            invalid_token(data, start)
+        codes += chunk.translate(DIGIT_IDS, KEEP_DIGITS)
+        offset = end
+    return codes
+
+# Raises ValueError for the first token of data (from offset start) that is not a tile name. Only called on invalid text.
+def invalid_token(data, start):
+    for token in bytes(data[start:]).split():
+        if token not in TILE_IDS:
+            raise ValueError("unknown tile: %r" % (token.decode(errors="replace"),))
+    raise ValueError("invalid instructions")
+
+# Reads a whole input in the format described above (n, then n lines of instructions) and returns the bytearray of tile ids.
+# -> data : bytes, bytearray or mmap of the input.
+def read_codes(data):
+    # The first token is n, the instructions start after it.
+    start = 0
+    while data[start:start + 1].isspace():
+        start += 1
+    end = start
+    while end < len(data) and not data[end:end + 1].isspace():
+        end += 1
+    n = int(data[start:end])
+    codes = encode_text(data, end)
+    if len(codes) != n:
+        raise ValueError("expected %d instructions, found %d" % (n, len(codes)))
+    return codes
+
+# Reads an instruction file through mmap and returns the bytearray of tile ids (one byte per step).
+# -> path : File in the input format described above.
+def read_codes_file(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("empty input")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return read_codes(data)
+
+# Minimum number of leg moves, in O(n) time, for a sequence of tile ids (same answer as solve_scan).
+# -> codes : Tile ids (encode_steps), any sequence of integers.
+# When neither leg is on the needed tile, the leg whose tile is needed again later (or never) moves, as in solve_scan.
+# Instead of scanning the remaining steps for that, the next occurrence of every step's tile is precomputed in one reverse pass.
+def min_moves(codes):
+    n = len(codes)
+    # With less than 2 steps both legs can be placed on the needed tiles, no move is needed.
+    if n < 2:
+        return 0
+
+    # next_same[i] is the next index after i with the same tile as step i, n if there is none.
+    next_same = array('i', [n]) * n
+    # Next index of each tile, seen from the current position of the reverse pass.
+    upcoming = array('i', [n]) * len(TILES)
+    for i in range(n - 1, -1, -1):
+        next_same[i] = upcoming[codes[i]]
+        upcoming[codes[i]] = i
+
+    # The first two steps are the initial positions of the left and right leg.
+    left = codes[0]
+    right = codes[1]
+    # Index of the next step that needs each leg's tile (n: never again). Step 1 is only the right leg's initial position.
+    left_next = next_same[0]
+    if left_next == 1:
+        left_next = next_same[1]
+    right_next = next_same[1]
+    no_of_steps = 0
+
+    for i in range(2, n):
+        value = codes[i]
+        if value == left or value == right:
+            # No move, the leg(s) on this tile are needed next at the next occurrence of the tile.
+            if value == left:
+                left_next = next_same[i]
+            if value == right:
+                right_next = next_same[i]
+        elif left_next < n and left_next <= right_next:
+            # The left leg's tile is needed first: the right leg moves.
+            right = value
+            right_next = next_same[i]
+            no_of_steps += 1
+        else:
+            # The right leg's tile is needed first, or neither tile is needed again: the left leg moves.
+            left = value
+            left_next = next_same[i]
+            no_of_steps += 1
+
+    return no_of_steps
+
+# One-byte search strings of the tile ids. mmap.find only takes bytes, bytes and bytearray also take them.
+NEEDLES = [bytes((tile,)) for tile in range(len(TILES))]
+
+# Minimum number of leg moves for a buffer of tile ids (same answer as min_moves), in O(n) time and O(1) extra memory.
+# -> codes : bytes, bytearray or mmap of tile ids (one byte per step), e.g. from encode_steps or read_codes.
+# Instead of a precomputed next-occurrence array, the next index of each tile is kept in upcoming and only the current step's tile
+# is searched again (codes.find, in C). The searches for one tile never overlap, so all of them together read each byte 4 times.
+def min_moves_buffer(codes):
+    n = len(codes)
+    # With less than 2 steps both legs can be placed on the needed tiles, no move is needed.
+    if n < 2:
+        return 0
+
+    # upcoming[t] is the index of the next step (from step 2 on) that needs tile t, n if there is none.
+    upcoming = [n] * len(TILES)
+    for tile in range(len(TILES)):
+        index = codes.find(NEEDLES[tile], 2)
+        if index != -1:
+            upcoming[tile] = index
+
+    # The first two steps are the initial positions of the left and right leg.
+    left = codes[0]
+    right = codes[1]
+    no_of_steps = 0
+
+    for i in range(2, n):
+        value = codes[i]
+        if value != left and value != right:
+            if upcoming[left] < n and upcoming[left] <= upcoming[right]:
+                # The left leg's tile is needed first: the right leg moves.
                 right = value
-                # Increments the step count as a leg position was updated
-                no_of_steps += 1
-                # Sets the flag to indicate a successful update (match was found).
-                flag = 1
-                # Exits the inner loop since a match was found.
-                break
-
-            # Checks if the right leg's current position matches a future step (values).
-            elif right == values:
-                # Updates the left leg to the current step's position (value).
+            else:
+                # The right leg's tile is needed first, or neither tile is needed again: the left leg moves.
                 left = value
-                # Increments the step count as a leg position was updated
-                no_of_steps += 1
-                # Sets the flag to indicate a successful update (match was found).
-                flag = 1
-                # Exits the inner loop since a match was found.
-                break
-
-        # If no match was found in the inner loop.
-        if flag == 0:
-            # Updates the left leg to the current step's position (value). It can also be right leg.
-            left = value
-            # Increments the step count as a leg position was updated
             no_of_steps += 1
+        index = codes.find(NEEDLES[value], i + 1)
+        upcoming[value] = n if index == -1 else index
+
+    return no_of_steps
+
+# Online solver: steps are pushed one at a time, and each step is decided once the next window steps are known.
+# -> window : Number of later steps looked at to choose the leg that moves (the lookahead).
+# The decisions are those of min_moves, except that a tile that is not needed within the window counts as never needed again.
+# With a window at least as long as the stream, the moves and their number are exactly those of min_moves.
+# Only the undecided steps are kept: a ring buffer of window + 1 tile ids, and for every tile the indices of its undecided steps
+# (oldest first), so the next occurrence of a leg's tile is the front of a deque. Memory is O(window) for any stream length.
+# Moves are returned as (step index, leg, tile), with leg "left" or "right" and tile one of TILES.
+class DanceStream:
+    def __init__(self, window=1024):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.buffer = bytearray(window + 1)
+        self.positions = [deque() for _ in TILES]
+        # Number of steps pushed and number of steps decided.
+        self.pushed = 0
+        self.decided = 0
+        # Tiles of the left and right leg (None until placed by the 1st and 2nd step).
+        self.left = None
+        self.right = None
+        # Running number of moves of the decided steps.
+        self.no_of_steps = 0
 
-    # Resets the flag to 0 for the next iteration of the outer loop.
+    # Adds the next step (tile name, str or bytes) and returns the moves that became final, in step order.
+    def push(self, step):
+        try:
+            code = TILE_IDS[step]
+        except KeyError:
+            raise ValueError("unknown tile: %r" % (step,)) from None
+        return self.push_code(code)
+
+    # Same as push, for a tile id.
+    def push_code(self, code):
+        self.buffer[self.pushed % len(self.buffer)] = code
+        self.positions[code].append(self.pushed)
+        self.pushed += 1
+        moves = []
+        # A step is decided as soon as the window after it is full.
+        while self.pushed - self.decided > self.window:
+            self.decide(moves)
+        return moves
+
+    # Decides every remaining step (end of the stream) and returns their moves. More steps can still be pushed afterwards.
+    def flush(self):
+        moves = []
+        while self.decided < self.pushed:
+            self.decide(moves)
+        return moves
+
+    # Decides the oldest undecided step and appends its move, if any, to moves.
+    def decide(self, moves):
+        i = self.decided
+        value = self.buffer[i % len(self.buffer)]
+        self.positions[value].popleft()
+        self.decided += 1
+
+        # The first two steps are the initial positions of the left and right leg.
+        if i == 0:
+            self.left = value
+        elif i == 1:
+            self.right = value
+        elif value != self.left and value != self.right:
+            # Index of the next known step that needs each leg's tile (None: not within the window).
+            left_next = self.positions[self.left][0] if self.positions[self.left] else None
+            right_next = self.positions[self.right][0] if self.positions[self.right] else None
+            if left_next is not None and (right_next is None or left_next <= right_next):
+                # The left leg's tile is needed first: the right leg moves.
+                self.right = value
+                moves.append((i, "right", TILES[value]))
+            else:
+                # The right leg's tile is needed first, or neither tile is needed within the window: the left leg moves.
+                self.left = value
+                moves.append((i, "left", TILES[value]))
+            self.no_of_steps += 1
+
+# State tables of exact_min_moves for a number of legs and tiles, built once per process and shared by all its calls.
+# Returns (states, valid, sources, position):
+# -> states   : Sorted tuples of the legs' tiles.
+# -> valid    : valid[s] holds the states with a leg on tile s.
+# -> sources  : sources[s][row] holds, for the state valid[s][row], the states it is reached from by moving one leg from tile x
+#               onto s, one column per x != s.
+# -> position : position[s] maps a state to its row in valid[s].
+@lru_cache(maxsize=None)
+def leg_tables(legs, tiles):
+    states = list(combinations_with_replacement(range(tiles), legs))
+    index = {state: i for i, state in enumerate(states)}
+    valid = []
+    sources = []
+    position = []
+    for s in range(tiles):
+        rows = [i for i, state in enumerate(states) if s in state]
+        columns = []
+        for i in rows:
+            others = list(states[i])
+            others.remove(s)
+            columns.append([index[tuple(sorted(others + [x]))] for x in range(tiles) if x != s])
+        valid.append(np.array(rows, dtype=np.intp))
+        sources.append(np.array(columns, dtype=np.intp).reshape(len(rows), tiles - 1))
+        position.append({i: row for row, i in enumerate(rows)})
+    return states, valid, sources, position
+
+# Per-process setup, called once by each worker of PARALLEL_RUNNER and SOLVE_SERVER before it solves anything: builds the state
+# tables of exact_min_moves for the usual 2 legs and 4 tiles.
+def warm_up():
+    if np is not None:
+        leg_tables(2, len(TILES))
+
+# Exact minimum number of moves for any number of legs and tiles, by dynamic programming over the leg positions.
+# -> codes : Tile ids (integers in range(tiles)), e.g. from encode_steps.
+# -> legs  : Number of legs.
+# -> tiles : Number of tiles.
+# -> path  : If True, also returns the moves that reach the minimum.
+# Legs are interchangeable, so a state is the sorted tuple of the legs' tiles (legs may share a tile). Before the first step the
+# legs can be placed anywhere for free. A step on tile s keeps the states that have a leg on s (no move), and reaches the others
+# by moving one leg onto s (1 move) - moving a leg only when a step needs it, onto that step's tile, is never worse.
+# Each step is one vectorized NumPy update of the whole state space, and only two rows of costs are kept (O(states) memory).
+# With path=True, the rows are also saved every sqrt(n) steps, and each segment is recomputed from its saved row when the moves
+# are traced back, so the memory stays O(sqrt(n) * states).
+# Returns the minimum, or (minimum, initial leg tiles, [(step index, from tile, to tile), ...]) with path=True.
+def exact_min_moves(codes, legs=2, tiles=len(TILES), path=False):
+    if np is None:
+        raise ImportError("exact_min_moves requires NumPy")
+    if any(not 0 <= code < tiles for code in codes):
+        raise ValueError("tile ids must be in range(%d)" % tiles)
+
+    n = len(codes)
+    states, valid, sources, position = leg_tables(legs, tiles)
+    # Larger than any number of moves.
+    unreachable = n + 1
+
+    # Costs after a step on tile s, from the costs before it, written into out.
+    def step(cost, s, out):
+        out.fill(unreachable)
+        best = cost[valid[s]]
+        if tiles > 1:
+            best = np.minimum(best, cost[sources[s]].min(axis=1) + 1)
+        out[valid[s]] = best
+        return out
+
+    cost = np.zeros(len(states), dtype=np.int32)
+    spare = np.empty_like(cost)
+    block = max(1, math.isqrt(n))
+    saved = {}
+    for i in range(n):
+        if path and i % block == 0:
+            saved[i] = cost.copy()
+        cost, spare = step(cost, codes[i], spare), cost
+
+    state = int(cost.argmin())
+    total = int(cost[state])
+    if not path:
+        return total
+
+    # Traces the moves back, one segment of block steps at a time (last segment first).
+    moves = []
+    end = n
+    for start in reversed(range(0, n, block)):
+        rows = [saved[start]]
+        for i in range(start, end):
+            rows.append(step(rows[-1], codes[i], np.empty_like(cost)))
+        for i in range(end - 1, start - 1, -1):
+            before = rows[i - start]
+            after = rows[i - start + 1]
+            if before[state] == after[state]:
+                # No move at this step.
+                continue
+            s = codes[i]
+            candidates = sources[s][position[s][state]]
+            column = int(np.argmin(before[candidates]))
+            moves.append((i, column if column < s else column + 1, s))
+            state = int(candidates[column])
+        end = start
+    moves.reverse()
+
+    return total, states[state], moves
+
+# Reads one instance from an iterator of whitespace-separated tokens (str or bytes), in the input format described above.
+# Returns the arguments of solve as a tuple.
+def read_instance(tokens):
+    # Number of steps or positions provided in the input sequence.
+    n = int(next(tokens))
+    # Steps or positions.
+    steps = [next(tokens) for _ in range(n)]
+    return (steps,)
+
+# Minimum number of leg moves for one list of steps, using the linear solver on the compact buffer (min_moves_buffer).
+# -> steps : List of tile names (str or bytes). It is not modified.
+# -> stats : Optional statistics object (see INSTRUMENT.py), receives the number of moves and the "encode" and "search" phase times.
+def solve(steps, stats=None):
+    with phase(stats, "encode"):
+        codes = encode_steps(steps)
+    with phase(stats, "search"):
+        no_of_steps = min_moves_buffer(codes)
+    if stats is not None:
+        stats.add("moves", no_of_steps)
+    return no_of_steps
+
+# Same answer as solve, computed by scanning the remaining steps at every mismatch (O(n²)).
+# -> steps : List of tiles. It is not modified.
+def solve_scan(steps):
+    # With less than 2 steps both legs can be placed on the needed tiles, no move is needed.
+    if len(steps) < 2:
+        return 0
+    steps = list(steps)
+
+    # Initializes the 1st and 2nd position in the steps list as the initial position of the left and right leg, respectively.
+    left = steps[0]
+    right = steps[1]
+    # Initializes the counter for the number of leg position updates (no_of_steps) to 0.
+    no_of_steps = 0
+
+    # Removes the 1st and 2nd position from the steps list as it has been assigned to the left and right leg, respectively.
+    steps.pop(0)
+    steps.pop(0)
+
+    # A flag variable used to check if a valid update for leg position has been made during the inner loop.
     flag = 0
 
-print(no_of_steps, end = "")
+    # Iterates over each position in the remaining steps list with both its index (i) and value (value).
+    for i, value in enumerate(steps):
+
+        # Checks if the current step (value) doesn't match the current positions of either the left leg (left) or the right leg (right).
+        # no_of_steps is updated only if neither left nor right leg is in the same position as the current step (value)
+        if left != value and right != value:
+
+            # Iterates through the remaining steps (starting from the current position i) to check for a future match for either leg.
+            for j, values in enumerate(steps[i:]):
+
+                # Checks if the left leg's current position matches a future step (values).
+                if left == values:
+                    # Updates the right leg to the current step's position (value).
+                    right = value
+                    # Increments the step count as a leg position was updated
+                    no_of_steps += 1
+                    # Sets the flag to indicate a successful update (match was found).
+                    flag = 1
+                    # Exits the inner loop since a match was found.
+                    break
+
+                # Checks if the right leg's current position matches a future step (values).
+                elif right == values:
+                    # Updates the left leg to the current step's position (value).
+                    left = value
+                    # Increments the step count as a leg position was updated
+                    no_of_steps += 1
+                    # Sets the flag to indicate a successful update (match was found).
+                    flag = 1
+                    # Exits the inner loop since a match was found.
+                    break
+
+            # If no match was found in the inner loop.
+            if flag == 0:
+                # Updates the left leg to the current step's position (value). It can also be right leg.
+                left = value
+                # Increments the step count as a leg position was updated
+                no_of_steps += 1
+
+        # Resets the flag to 0 for the next iteration of the outer loop.
+        flag = 0
 
+    return no_of_steps
 
+# Reads the instructions as bytes and solves them on the compact buffer, without building one string per step.
+# A regular file given as standard input is memory-mapped instead of read.
+def main():
+    if os.path.isfile("/dev/stdin") and os.fstat(0).st_size > 0:
+        with mmap.mmap(0, 0, access=mmap.ACCESS_READ) as data:
+            codes = read_codes(data)
+    else:
+        codes = read_codes(sys.stdin.buffer.read())
+    print(min_moves_buffer(codes), end = "")
 
-    
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+INSTRUMENT
+
+Description:
+-> Solves every instance of one problem (same input as BATCH_RUNNER) and reports what the solvers did.
+-> Counters: nodes expanded, prunes, cache hits and maximum recursion depth of the searches, Dijkstra relaxations and heap
+   operations, bus trips, queue operations, and the stage at which each JUSTIFY_WORDS check was decided.
+-> Phase timers (wall-clock seconds): parse, solve, and inside solve: shortest paths, allocation, bounds, search, encode.
+   Phases can be nested (solve contains the solver's own phases).
+-> The statistics are written as JSON or CSV.
+-> Optional cProfile report (functions with the largest cumulative time) and tracemalloc report (peak memory, largest allocation sites).
+
+The solvers only collect statistics when a stats object is passed to them (stats=None by default). Their counters are kept in
+local variables and reported once per call, so the solvers run at the same speed when statistics are off.
+
+Usage:
+python INSTRUMENT.py PROBLEM [FILE] [-f json|csv] [-o OUT] [--profile] [--memory]
+
+PROBLEM -> BUS_COUNT, DANCE_DEV or JUSTIFY_WORDS.
+FILE    -> Input file, standard input if missing.
+OUT     -> File for the statistics, standard error if missing (answers go to standard output).
+"""
+
+import argparse
+import collections
+import contextlib
+import cProfile
+import csv
+import importlib
+import inspect
+import io
+import json
+import pstats
+import sys
+import time
+import tracemalloc
+
+from BATCH_RUNNER import PROBLEMS, read_instances, tokenize
+
+# Counters and phase timers of one run, passed to the solvers as stats.
+class Stats:
+    def __init__(self):
+        self.counters = collections.Counter()
+        # Total seconds and number of calls of each phase.
+        self.timers = collections.defaultdict(float)
+        self.calls = collections.Counter()
+
+    # Adds value to the counter name.
+    def add(self, name, value=1):
+        self.counters[name] += value
+
+    # Raises the counter name to value if it is lower (for maxima, such as recursion depths).
+    def maximum(self, name, value):
+        self.counters[name] = max(self.counters[name], value)
+
+    # Context manager that adds the wall-clock time of its block to the phase name.
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] += time.perf_counter() - start
+            self.calls[name] += 1
+
+    # Returns the statistics as a dict: {"counters": {name: value}, "phases": {name: {"seconds": s, "calls": c}}}.
+    def as_dict(self):
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "phases": {name: {"seconds": self.timers[name], "calls": self.calls[name]} for name in sorted(self.timers)},
+        }
+
+    # Writes the statistics to a text stream as JSON.
+    def write_json(self, out):
+        json.dump(self.as_dict(), out, indent=2)
+        out.write("\n")
+
+    # Writes the statistics to a text stream as CSV, one row per value: kind, name, value.
+    def write_csv(self, out):
+        writer = csv.writer(out)
+        writer.writerow(("kind", "name", "value"))
+        for name, value in sorted(self.counters.items()):
+            writer.writerow(("counter", name, value))
+        for name in sorted(self.timers):
+            writer.writerow(("seconds", name, "%.6f" % self.timers[name]))
+            writer.writerow(("calls", name, self.calls[name]))
+
+# Runs call() under cProfile and writes the limit functions with the largest cumulative time to out. Returns call's result.
+def profiled(call, out, limit=25):
+    profile = cProfile.Profile()
+    try:
+        return profile.runcall(call)
+    finally:
+        report = io.StringIO()
+        pstats.Stats(profile, stream=report).sort_stats("cumulative").print_stats(limit)
+        out.write(report.getvalue())
+
+# Runs call() under tracemalloc and writes the peak memory and the limit largest allocation sites to out. Returns call's result.
+def traced_memory(call, out, limit=10):
+    tracemalloc.start()
+    try:
+        return call()
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        out.write("memory: %d bytes allocated, %d bytes peak\n" % (current, peak))
+        for statistic in snapshot.statistics("lineno")[:limit]:
+            out.write("%s\n" % statistic)
+
+# Solves every instance of data, writes the answers to out (one per line) and collects statistics into stats.
+# -> problem : Name of the problem (one of PROBLEMS).
+# -> data    : Input contents, as bytes.
+# -> out     : Binary output stream.
+# -> stats   : Stats object.
+def run(problem, data, out, stats):
+    module = importlib.import_module(problem)
+    # Solvers without a stats parameter are only timed as a whole.
+    takes_stats = "stats" in inspect.signature(module.solve).parameters
+    with stats.phase("parse"):
+        tokens = tokenize(data)
+    instances = read_instances(module, tokens)
+
+    while True:
+        with stats.phase("parse"):
+            instance = next(instances, None)
+        if instance is None:
+            break
+        with stats.phase("solve"):
+            if takes_stats:
+                answer = module.solve(*instance, stats=stats)
+            else:
+                answer = module.solve(*instance)
+        stats.add("instances")
+        out.write(b"%d\n" % answer)
+    out.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve instances of one problem and report solver statistics.")
+    parser.add_argument("problem", choices=PROBLEMS)
+    parser.add_argument("file", nargs="?", help="input file (default: standard input)")
+    parser.add_argument("-f", "--format", choices=("json", "csv"), default="json", help="statistics format (default: json)")
+    parser.add_argument("-o", "--output", help="statistics file (default: standard error)")
+    parser.add_argument("--profile", action="store_true", help="also write a cProfile report to standard error")
+    parser.add_argument("--memory", action="store_true", help="also write a tracemalloc report to standard error")
+    args = parser.parse_args()
+
+    if args.file is not None:
+        with open(args.file, "rb") as f:
+            data = f.read()
+    else:
+        data = sys.stdin.buffer.read()
+
+    # The solver module is imported first, so that the reports are about solving and not about importing.
+    importlib.import_module(args.problem)
+    stats = Stats()
+    call = lambda: run(args.problem, data, sys.stdout.buffer, stats)
+    if args.memory:
+        call = lambda call=call: traced_memory(call, sys.stderr)
+    if args.profile:
+        call = lambda call=call: profiled(call, sys.stderr)
+    call()
+
+    write = stats.write_json if args.format == "json" else stats.write_csv
+    if args.output is not None:
+        with open(args.output, "w", newline="") as f:
+            write(f)
+    else:
+        write(sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -50,87 +50,706 @@ _ -> represents space
 7 words in total have been placed in 5 lines with maximum width of 5 characters for each line
 """
 
-# Defines the recursive function to try placing words in different lines and maximize the word count.
-# -> i      : The current index of the word being processed.
-# -> n_lines: A list where each element tracks the current total length of words in a particular line.
-# -> count  : The count of words successfully placed across the lines.
-# -> words  : The list of words to distribute.
-def justify_words(i, n_lines, count, words):
-    # Declares result as a global variable to track the maximum number of words successfully placed.
-    global result
-
-    # Base case: If all words have been processed.
-    if i == len(words):
-        # Update the global result with the maximum of the current result and the current count.
-        result = max(result, count)
-        # Exit the recursion.
-        return
-    
-    # Implements a pruning condition (backtracking):
-    # If the maximum possible words we could place (count + (len(words) - i)) is less than or equal to the current result, further exploration is unnecessary.
-    if count + (len(words) - i) <= result:
-        # Exit the recursion.
-        return
-
-    # Loops through each line to try placing the current word (words[i]).
-    for j in range(n):
-
-        # Try placing words in empty lines
-        # If the current line j is empty.
-        if n_lines[j] == 0:
-            # Place the word in the line by setting its length as the line's total length.
-            n_lines[j] = len(words[i])
-            #Recursively process the next word, incrementing the count.
-            justify_words(i + 1, n_lines, count + 1, words)
-            # Backtrack by resetting the line's total length to 0 after exploring this option.
-            n_lines[j] = 0  
-            # Break the loop to avoid placing the word in other empty lines.
+import bisect
+import sys
+import time
+from collections import Counter, OrderedDict
+from fractions import Fraction
+
+from STATS import phase
+
+# Maximum number of states remembered by the transposition cache of justify_words (least recently used states are dropped first).
+SEARCH_CACHE_SIZE = 100000
+
+# Raises TimeoutError once time.monotonic() has passed deadline (None: no deadline). Used by the exact engine in anytime mode.
+def check_deadline(deadline):
+    if deadline is not None and time.monotonic() > deadline:
+        raise TimeoutError("deadline passed")
+
+# Backtracking search for the maximum number of words that can be placed into n lines of width m.
+# -> words      : The list of words to distribute, sorted longest first, all of them at most m characters long.
+# -> n          : Number of lines.
+# -> m          : Maximum width of each line.
+# -> cache_size : Maximum number of states kept in the transposition cache.
+# -> stats      : Optional statistics object, receives the numbers of expanded nodes, bound prunes and cache hits, and the
+#                 maximum recursion depth.
+# Returns the maximum word count. Everything the search needs is local, so calls are independent of each other.
+def justify_words(words, n, m, cache_size=SEARCH_CACHE_SIZE, stats=None):
+    # tail[r] is the room needed by the r shortest words (the last r words), each one with the space that follows it.
+    tail = [0]
+    for w in reversed(words):
+        tail.append(tail[-1] + len(w) + 1)
+
+    # Transposition cache: state (index of the next word, sorted line lengths) -> highest count with which it was reached.
+    # Lines are interchangeable, so the same multiset of line lengths is the same state whatever line holds what.
+    cache = OrderedDict()
+    # Tracks the maximum number of words successfully placed.
+    result = 0
+    # Search counters, reported to stats at the end.
+    expansions = 0
+    prunes = 0
+    cache_hits = 0
+    # Deepest recursion level reached (index of the word being processed).
+    depth = 0
+
+    # Defines the recursive function to try placing words in different lines and maximize the word count.
+    # -> i      : The current index of the word being processed.
+    # -> n_lines: A list where each element tracks the current total length of words in a particular line.
+    # -> count  : The count of words successfully placed across the lines.
+    def search(i, n_lines, count):
+        nonlocal result, expansions, prunes, cache_hits, depth
+        if i > depth:
+            depth = i
+
+        # Base case: If all words have been processed.
+        if i == len(words):
+            # Update the result with the maximum of the current result and the current count.
+            result = max(result, count)
+            # Exit the recursion.
+            return
+
+        # Implements a pruning condition (backtracking):
+        # At most the shortest remaining words fit into the room left on the lines (m + 1 on an empty line, m - length otherwise,
+        # each word taking its length + 1). If even that cannot beat the current result, further exploration is unnecessary.
+        room = sum(m - length if length else m + 1 for length in n_lines)
+        if count + min(bisect.bisect_right(tail, room) - 1, len(words) - i) <= result:
+            prunes += 1
+            # Exit the recursion.
+            return
+
+        # The same lines were already reached with at least as many words placed: nothing better can follow.
+        key = (i, tuple(sorted(n_lines)))
+        if cache.get(key, -1) >= count:
+            cache_hits += 1
+            cache.move_to_end(key)
+            return
+        expansions += 1
+        cache[key] = count
+        cache.move_to_end(key)
+        if len(cache) > cache_size:
+            cache.popitem(last=False)
+
+        # Line lengths already tried for the current word. Lines with the same length give the same states, only one is tried.
+        # This also covers the empty lines: the word is only tried in the first one.
+        tried = set()
+
+        # Loops through each line to try placing the current word (words[i]).
+        for j in range(n):
+            if n_lines[j] in tried:
+                continue
+            tried.add(n_lines[j])
+
+            # Try placing words in empty lines
+            # If the current line j is empty.
+            if n_lines[j] == 0:
+                # Place the word in the line by setting its length as the line's total length.
+                n_lines[j] = len(words[i])
+                # Recursively process the next word, incrementing the count.
+                search(i + 1, n_lines, count + 1)
+                # Backtrack by resetting the line's total length to 0 after exploring this option.
+                n_lines[j] = 0
+
+            # Try placing words in non-empty lines
+            # Checks if the word can fit into the current line j. The condition ensures there is enough space, including one space between words.
+            elif n_lines[j] + 1 + len(words[i]) <= m:
+                # Add the word and a space to the line's total length.
+                n_lines[j] += 1 + len(words[i])
+                # Recursively process the next word, incrementing the count.
+                search(i + 1, n_lines, count + 1)
+                # Backtrack by removing the word and space from the line after exploring this option.
+                n_lines[j] -= 1 + len(words[i])
+
+        # Skip the current word without placing it in any line. Recursively moves to the next word without changing the count.
+        search(i + 1, n_lines, count)
+
+    # The search goes one level deeper per word.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), len(words) + 100))
+    # Calls the recursive function with:
+    # -> 0      : Starting index for the words list.
+    # -> n_lines: The empty lines array, initializes a list of size n, with each element set to 0.
+    # -> 0      : Initial count of placed words.
+    search(0, [0] * n, 0)
+
+    if stats is not None:
+        stats.add("expansions", expansions)
+        stats.add("prunes", prunes)
+        stats.add("cache hits", cache_hits)
+        stats.maximum("max depth", depth)
+    return result
+
+# The exact engine below uses the fact that if t words can be placed, the t shortest words can be placed as well
+# (any placed word can be swapped with a shorter unused one). So the answer is the largest t for which the t shortest words fit.
+# Placing a word of length L costs L + 1 on a line of capacity m + 1 (the extra 1 is the space before the next word, or the unused
+# space at the end of the line), which turns each check into a bin packing problem with n bins of capacity m + 1.
+
+# Greedy packing: each size (largest first) goes into the first opened line with enough room, a new line is opened otherwise.
+# Returns True if all sizes were placed in at most n lines. A True answer is always correct, False only means the greedy failed.
+# -> sizes    : Word costs (length + 1), sorted in decreasing order.
+# -> n        : Number of lines.
+# -> capacity : Line capacity (m + 1).
+# -> deadline : Optional time.monotonic() value, TimeoutError is raised when it passes.
+# Equal sizes are placed together: the first line with room takes as many of them as fit, then the next one, and the rest go to
+# new lines, as many per line as fit. This is the same packing as placing them one by one, in O(distinct sizes * lines).
+def first_fit_decreasing(sizes, n, capacity, deadline=None):
+    free = []
+    counts = Counter(sizes)
+    for size in sorted(counts, reverse=True):
+        check_deadline(deadline)
+        if size > capacity:
+            return False
+        left = counts[size]
+        for j, room in enumerate(free):
+            if room >= size:
+                taken = min(left, room // size)
+                free[j] = room - taken * size
+                left -= taken
+                if not left:
+                    break
+        if left:
+            per_line = capacity // size
+            full, rest = divmod(left, per_line)
+            if len(free) + full + (1 if rest else 0) > n:
+                return False
+            free.extend([capacity - per_line * size] * full)
+            if rest:
+                free.append(capacity - rest * size)
+    return True
+
+# Lower bound on the number of lines needed for the given sizes (any packing uses at least that many lines).
+# -> values   : Distinct sizes.
+# -> counts   : counts[k] is the number of words of size values[k].
+# -> capacity : Line capacity (m + 1).
+# -> deadline : Optional time.monotonic() value, TimeoutError is raised when it passes.
+# It is the best of the Martello-Toth L2 bound and the Fekete-Schepers dual feasible function bounds, computed in integers.
+def lines_lower_bound(values, counts, capacity, deadline=None):
+    best = 0
+
+    # L2: for a threshold a, sizes above capacity - a and sizes above half a line each need their own line, and the sizes between
+    # a and half a line must fit into the room those lines leave, or need more lines.
+    for a in range(capacity // 2 + 1):
+        check_deadline(deadline)
+        alone = 0
+        half = 0
+        half_room = 0
+        small = 0
+        for value, count in zip(values, counts):
+            if value > capacity - a:
+                alone += count
+            elif 2 * value > capacity:
+                half += count
+                half_room += count * (capacity - value)
+            elif value >= a:
+                small += count * value
+        extra = max(0, -(-(small - half_room) // capacity))
+        best = max(best, alone + half + extra)
+
+    # Dual feasible functions u(k): a size x is rounded down to a multiple of capacity / (k + 1), unless x * (k + 1) already is
+    # a multiple of capacity. The rounded sizes of one line still add up to at most capacity. Everything is scaled by k + 1.
+    for k in range(1, capacity + 1):
+        check_deadline(deadline)
+        total = 0
+        for value, count in zip(values, counts):
+            scaled = value * (k + 1)
+            total += count * (scaled if scaled % capacity == 0 else scaled // capacity * capacity)
+        best = max(best, -(-total // (capacity * (k + 1))))
+
+    return best
+
+# At most this many simplex iterations are done by lp_relaxation (the bound stays valid when it stops early).
+MAX_LP_ITERATIONS = 1000
+
+# Returns the line content (pattern) with the largest total weight and that weight, by an unbounded knapsack over the line's room.
+# -> values   : Distinct sizes.
+# -> weights  : Weight of each size (floats or fractions).
+# -> capacity : Line capacity (m + 1).
+# -> deadline : Optional time.monotonic() value, TimeoutError is raised when it passes.
+def heaviest_pattern(values, weights, capacity, deadline=None):
+    # best[r] is the largest weight of a line content of total size at most r, choice[r] the size index added last (-1: none).
+    best = [weights[0] * 0] * (capacity + 1)
+    choice = [-1] * (capacity + 1)
+    for room in range(1, capacity + 1):
+        check_deadline(deadline)
+        best[room] = best[room - 1]
+        for k, value in enumerate(values):
+            if value <= room and best[room - value] + weights[k] > best[room]:
+                best[room] = best[room - value] + weights[k]
+                choice[room] = k
+    pattern = [0] * len(values)
+    room = capacity
+    while room > 0:
+        if choice[room] == -1:
+            room -= 1
+        else:
+            pattern[choice[room]] += 1
+            room -= values[choice[room]]
+    return tuple(pattern), best[capacity]
+
+# Linear programming relaxation of the packing (the cutting stock relaxation): how many lines of each content (pattern) would be
+# used if fractions of lines were allowed.
+# -> values   : Distinct sizes.
+# -> counts   : counts[k] is the number of words of size values[k].
+# -> capacity : Line capacity (m + 1).
+# Revised simplex with column generation: minimize the number of lines x[p] such that the patterns cover counts[k] words of each
+# size. Only the basis (one column per size) is stored, the entering pattern is the heaviest one under the current dual weights.
+# The dual weights y[k] (at least 0, no pattern heavier than 1) prove that at least sum(counts[k] * y[k]) lines are needed. They
+# are checked and evaluated exactly with fractions, so the bound is safe from rounding errors.
+# Returns (lower bound, [(fractional number of lines, pattern), ...]).
+# -> stats    : Optional statistics object, receives the number of simplex iterations.
+# -> deadline : Optional time.monotonic() value, TimeoutError is raised when it passes.
+def lp_relaxation(values, counts, capacity, stats=None, deadline=None):
+    sizes = len(values)
+    # Start with one pattern per size: as many words of that size as fit on a line.
+    basis = [tuple(capacity // value if j == k else 0 for j in range(sizes)) for k, value in enumerate(values)]
+    # Pattern columns cost one line, surplus columns (more words covered than needed, None in basis) cost nothing.
+    inverse = [[1.0 / basis[k][k] if j == k else 0.0 for j in range(sizes)] for k in range(sizes)]
+    lines = [counts[k] / basis[k][k] for k in range(sizes)]
+
+    iterations = 0
+    for iterations in range(1, MAX_LP_ITERATIONS + 1):
+        check_deadline(deadline)
+        # Dual weights: cost of the basic columns times the inverse of the basis.
+        weights = [sum(inverse[i][j] for i in range(sizes) if basis[i] is not None) for j in range(sizes)]
+
+        # Entering column: a surplus column if a weight is negative, otherwise the heaviest pattern if it weighs more than 1.
+        surplus = next((j for j in range(sizes) if weights[j] < -1e-9), None)
+        if surplus is not None:
+            entering = None
+            column = [-1.0 if j == surplus else 0.0 for j in range(sizes)]
+        else:
+            entering, weight = heaviest_pattern(values, weights, capacity, deadline)
+            if weight <= 1 + 1e-9:
+                break
+            column = [float(copies) for copies in entering]
+
+        direction = [sum(inverse[i][j] * column[j] for j in range(sizes)) for i in range(sizes)]
+        leave = None
+        for i in range(sizes):
+            if direction[i] > 1e-9:
+                ratio = lines[i] / direction[i]
+                if leave is None or ratio < best - 1e-12:
+                    leave, best = i, ratio
+        if leave is None:
+            break
+
+        # Pivot: the leaving row is divided by the pivot, the other rows are updated from it.
+        factor = direction[leave]
+        inverse[leave] = [value / factor for value in inverse[leave]]
+        lines[leave] /= factor
+        for i in range(sizes):
+            if i != leave and direction[i]:
+                factor = direction[i]
+                inverse[i] = [value - factor * pivot for value, pivot in zip(inverse[i], inverse[leave])]
+                lines[i] -= factor * lines[leave]
+        basis[leave] = entering
+
+    weights = [Fraction(max(weight, 0.0)) for weight in weights]
+    # Rounding errors may leave a pattern slightly heavier than 1, the weights are scaled down exactly in that case.
+    heaviest = heaviest_pattern(values, weights, capacity, deadline)[1]
+    if heaviest > 1:
+        weights = [weight / heaviest for weight in weights]
+    usage = [(lines[i], basis[i]) for i in range(sizes) if basis[i] is not None and lines[i] > 1e-9]
+    if stats is not None:
+        stats.add("lp iterations", iterations)
+    return sum(count * weight for count, weight in zip(counts, weights)), usage
+
+# Exact search: can counts[k] words of size values[k] (for every k) be placed into n lines of the given capacity?
+# -> values   : Distinct sizes, in decreasing order.
+# -> counts   : counts[k] is the number of words of size values[k]. Restored before returning.
+# -> n        : Number of lines.
+# -> capacity : Line capacity (m + 1).
+# The search fills one line at a time. Equal words are handled as counts, so they are never swapped, and the lines are not
+# ordered: the next line is always the one that holds the largest remaining word. Only lines with no room left for any remaining
+# word are tried (a word could always be moved into that room), fullest first, and the total unused room (slack) may not exceed
+# n * capacity - total size. States (remaining counts, lines left) that failed are memoized.
+# -> stats    : Optional statistics object, receives the numbers of expanded lines, prunes and memo hits, and the maximum
+#               recursion depth (number of lines filled).
+# -> deadline : Optional time.monotonic() value, TimeoutError is raised when it passes (counts are then not restored).
+def pack_lines(values, counts, n, capacity, stats=None, deadline=None):
+    slack = n * capacity - sum(count * value for count, value in zip(counts, values))
+    if slack < 0:
+        return False
+    failed = set()
+    # Search counters, reported to stats at the end.
+    expansions = 0
+    prunes = 0
+    memo_hits = 0
+    depth = 0
+    # The search goes one level deeper per line.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), n + 100))
+
+    # Returns the possible contents of the next line as (unused room, words taken of each size), fullest first.
+    # -> first : Index of the largest remaining size, one word of that size is already on the line.
+    # -> slack : Unused room still allowed.
+    def line_fills(first, slack):
+        fills = []
+        taken = [0] * len(values)
+        taken[first] = 1
+        counts[first] -= 1
+
+        # Chooses how many words of size values[k] go on the line, which has room characters left.
+        def extend(k, room):
+            nonlocal prunes
+            while k < len(values) and (values[k] > room or not counts[k]):
+                k += 1
+            if k == len(values):
+                check_deadline(deadline)
+                # The line is complete. It must not waste more than the slack, and no remaining word may fit into its room.
+                smallest = next((values[j] for j in range(len(values) - 1, -1, -1) if counts[j]), None)
+                if room <= slack and (smallest is None or smallest > room):
+                    fills.append((room, tuple(taken)))
+                return
+            # Even all the remaining words would leave too much room.
+            if room - sum(counts[j] * values[j] for j in range(k, len(values))) > slack:
+                prunes += 1
+                return
+            value = values[k]
+            for copies in range(min(counts[k], room // value), -1, -1):
+                counts[k] -= copies
+                taken[k] += copies
+                extend(k + 1, room - copies * value)
+                taken[k] -= copies
+                counts[k] += copies
+
+        extend(first, capacity - values[first])
+        counts[first] += 1
+        fills.sort()
+        return fills
+
+    # Fills the next line, with lines empty lines left and slack unused room allowed.
+    def fill(lines, slack):
+        nonlocal expansions, memo_hits, depth
+        if n - lines > depth:
+            depth = n - lines
+        first = next((k for k, count in enumerate(counts) if count), None)
+        if first is None:
+            return True
+        if lines == 0:
+            return False
+        key = (tuple(counts), lines)
+        if key in failed:
+            memo_hits += 1
+            return False
+        check_deadline(deadline)
+        expansions += 1
+
+        for room, taken in line_fills(first, slack):
+            for k, copies in enumerate(taken):
+                counts[k] -= copies
+            found = fill(lines - 1, slack - room)
+            for k, copies in enumerate(taken):
+                counts[k] += copies
+            if found:
+                return True
+
+        failed.add(key)
+        return False
+
+    found = fill(n, slack)
+    if stats is not None:
+        stats.add("pack expansions", expansions)
+        stats.add("pack prunes", prunes)
+        stats.add("pack memo hits", memo_hits)
+        stats.maximum("pack max depth", depth)
+    return found
+
+# Exact check whether all sizes fit into n lines of the given capacity.
+# -> sizes    : Word costs (length + 1), sorted in decreasing order.
+# -> n        : Number of lines.
+# -> capacity : Line capacity (m + 1).
+# Cheap checks come first (total room, first fit decreasing, lower bounds). Then the linear programming relaxation is rounded
+# down to whole lines and only the few words it leaves are searched for. The full search (pack_lines) is the last resort.
+# -> stats    : Optional statistics object, receives the number of checks decided at each stage ("fits: <stage>").
+# -> deadline : Optional time.monotonic() value, TimeoutError is raised when it passes before the check is decided.
+def fits(sizes, n, capacity, stats=None, deadline=None):
+    if not sizes:
+        return True
+    if n <= 0 or sizes[0] > capacity:
+        return False
+
+    # Not enough room in total, or too many sizes larger than half a line (no two of them can share a line).
+    if sum(sizes) > n * capacity or sum(1 for size in sizes if 2 * size > capacity) > n:
+        if stats is not None:
+            stats.add("fits: room")
+        return False
+    # The greedy packing is usually enough to prove that the sizes fit.
+    if first_fit_decreasing(sizes, n, capacity, deadline):
+        if stats is not None:
+            stats.add("fits: first fit")
+        return True
+
+    # Distinct sizes, largest first, and how many words of each size there are.
+    sizes_count = Counter(sizes)
+    values = sorted(sizes_count, reverse=True)
+    counts = [sizes_count[value] for value in values]
+    if lines_lower_bound(values, counts, capacity, deadline) > n:
+        if stats is not None:
+            stats.add("fits: lower bound")
+        return False
+    bound, usage = lp_relaxation(values, counts, capacity, stats, deadline)
+    if bound > n:
+        if stats is not None:
+            stats.add("fits: lp bound")
+        return False
+
+    # Rounding: the whole lines of the relaxation are used as they are (most used patterns first), the rest is searched for.
+    rest = counts[:]
+    lines = n
+    for lines_used, pattern in sorted(usage, reverse=True):
+        for _ in range(min(int(lines_used + 1e-9), lines)):
+            for k, copies in enumerate(pattern):
+                rest[k] -= min(rest[k], copies)
+            lines -= 1
+    if rest != counts and pack_lines(values, rest, lines, capacity, stats, deadline):
+        if stats is not None:
+            stats.add("fits: lp rounding")
+        return True
+
+    if stats is not None:
+        stats.add("fits: search")
+    return pack_lines(values, counts, n, capacity, stats, deadline)
+
+# Upper bound on the answer: the t shortest words must fit into the total room, and at most n of them may be longer than half a line.
+# -> sizes    : Word costs (length + 1) of the words that fit on a line, sorted in increasing order.
+# -> n        : Number of lines.
+# -> capacity : Line capacity (m + 1).
+def words_upper_bound(sizes, n, capacity):
+    high = 0
+    total = 0
+    large = 0
+    for size in sizes:
+        total += size
+        large += 2 * size > capacity
+        if total > n * capacity or large > n:
+            break
+        high += 1
+    return high
+
+# Lower bound on the answer: the largest t in [low, high] for which the greedy packing of the t shortest words succeeds (found by
+# binary search), given that it succeeds for the low shortest ones.
+# -> deadline : Optional time.monotonic() value. When it passes, the search stops and the lower bound found so far is returned.
+def greedy_fit(sizes, n, capacity, low, high, deadline=None):
+    while low < high:
+        mid = (low + high + 1) // 2
+        try:
+            found = first_fit_decreasing(sizes[mid - 1::-1], n, capacity, deadline)
+        except TimeoutError:
             break
+        if found:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+# Largest t in [low, high] for which the t shortest sizes fit into n lines, given that the low shortest ones fit and that more
+# than high never do.
+# -> sizes    : Word costs (length + 1) of the words that fit on a line, sorted in increasing order.
+# -> n        : Number of lines.
+# -> capacity : Line capacity (m + 1).
+# -> stats    : Optional statistics object, receives the search counters and the "bounds" and "search" phase times.
+def largest_fit(sizes, n, capacity, low, high, stats=None):
+    with phase(stats, "bounds"):
+        low = greedy_fit(sizes, n, capacity, low, high)
+
+    # Binary search of the exact answer between the bounds. If the t shortest words fit, so do the t - 1 shortest ones.
+    with phase(stats, "search"):
+        while low < high:
+            mid = (low + high + 1) // 2
+            if fits(sizes[mid - 1::-1], n, capacity, stats):
+                low = mid
+            else:
+                high = mid - 1
+
+    return low
+
+# Maximum number of words that can be arranged into n lines of width m (exact).
+# -> words : List of words.
+# -> n     : Number of lines.
+# -> m     : Maximum width of each line.
+# -> stats : Optional statistics object, receives the search counters and the "bounds" and "search" phase times.
+def max_words(words, n, m, stats=None):
+    capacity = m + 1
+    # Costs of the words that fit on a line at all, shortest first.
+    sizes = sorted(len(w) + 1 for w in words if len(w) <= m)
+    if n <= 0 or not sizes:
+        return 0
+    return largest_fit(sizes, n, capacity, 0, words_upper_bound(sizes, n, capacity), stats)
+
+# Anytime version of max_words: returns (count, proven optimal) by the deadline.
+# -> words    : List of words.
+# -> n        : Number of lines.
+# -> m        : Maximum width of each line.
+# -> deadline : time.monotonic() value by which the answer is needed.
+# -> stats    : Optional statistics object (see max_words).
+# The greedy packing of the shortest words gives a valid count, and the upper bound tells whether it is already optimal.
+# The exact binary search then raises the count (or lowers the bound) until they meet. Every step checks the deadline, the greedy
+# bound included: when it passes, the count found so far is returned. The returned count is always achievable; it is proven
+# optimal when the search completed.
+def max_words_anytime(words, n, m, deadline, stats=None):
+    capacity = m + 1
+    sizes = sorted(len(w) + 1 for w in words if len(w) <= m)
+    if n <= 0 or not sizes:
+        return 0, True
+
+    with phase(stats, "bounds"):
+        high = words_upper_bound(sizes, n, capacity)
+        low = greedy_fit(sizes, n, capacity, 0, high, deadline)
+    if low < high and time.monotonic() > deadline:
+        if stats is not None:
+            stats.add("deadline hits")
+        return low, False
+
+    with phase(stats, "search"):
+        while low < high:
+            mid = (low + high + 1) // 2
+            try:
+                found = fits(sizes[mid - 1::-1], n, capacity, stats, deadline)
+            except TimeoutError:
+                if stats is not None:
+                    stats.add("deadline hits")
+                return low, False
+            if found:
+                low = mid
+            else:
+                high = mid - 1
+
+    return low, True
+
+# Maximum number of answers kept by a Layouts object (least recently used answers are dropped first).
+LAYOUT_CACHE_SIZE = 100000
+
+# Answers many (n, m) queries about one word list.
+# -> words      : List of words.
+# -> cache_size : Maximum number of answers kept.
+# The word costs (length + 1) are sorted once, with their prefix sums. For any width m, the words that fit on a line are a prefix
+# of that list, so every query works on the same list: its upper bound takes two binary searches, and the exact search
+# (largest_fit) only runs between bounds. The answer grows with n and with m, so every cached answer (n', m') with n' <= n and
+# m' <= m is a lower bound, and one with n' >= n and m' >= m an upper bound. The cached answers are indexed by n, each n with its
+# widths in sorted order, so the nearest such answers (closest n, then closest width) are found by binary searches.
+class Layouts:
+    def __init__(self, words, cache_size=LAYOUT_CACHE_SIZE):
+        self.sizes = sorted(len(w) + 1 for w in words)
+        # prefix[t] is the total cost of the t shortest words.
+        self.prefix = [0]
+        for size in self.sizes:
+            self.prefix.append(self.prefix[-1] + size)
+        # Cached answers: (n, m) -> maximum number of words, least recently used first.
+        self.answers = OrderedDict()
+        self.cache_size = cache_size
+        # Index of the cached answers: the sorted numbers of lines (lines), and for each of them the sorted widths (widths[n]) and
+        # their answers (counts[n], in increasing order as well).
+        self.lines = []
+        self.widths = {}
+        self.counts = {}
+
+    # Upper bound for n lines of width m: words that fit on a line, total room, and at most n words longer than half a line.
+    def upper_bound(self, n, m):
+        capacity = m + 1
+        fitting = bisect.bisect_right(self.sizes, capacity)
+        small = bisect.bisect_right(self.sizes, capacity // 2)
+        return min(fitting, bisect.bisect_right(self.prefix, n * capacity) - 1, small + n)
+
+    # Maximum number of words that can be arranged into n lines of width m.
+    def query(self, n, m, stats=None):
+        if n <= 0 or m <= 0:
+            return 0
+        answer = self.answers.get((n, m))
+        if answer is not None:
+            self.answers.move_to_end((n, m))
+            return answer
+
+        low = 0
+        high = self.upper_bound(n, m)
+        # Lower bound: the widest cached answer of at most m, with the largest number of lines of at most n.
+        i = bisect.bisect_right(self.lines, n)
+        if i:
+            lines = self.lines[i - 1]
+            k = bisect.bisect_right(self.widths[lines], m)
+            if k:
+                low = self.counts[lines][k - 1]
+        # Upper bound: the narrowest cached answer of at least m, with the smallest number of lines of at least n.
+        i = bisect.bisect_left(self.lines, n)
+        if i < len(self.lines):
+            lines = self.lines[i]
+            k = bisect.bisect_left(self.widths[lines], m)
+            if k < len(self.widths[lines]):
+                high = min(high, self.counts[lines][k])
+
+        answer = largest_fit(self.sizes, n, m + 1, low, high, stats) if low < high else high
+        self.store(n, m, answer)
+        return answer
+
+    # Adds an answer to the cache and its index, and drops the least recently used one if the cache is full.
+    def store(self, n, m, answer):
+        self.answers[n, m] = answer
+        if n not in self.widths:
+            bisect.insort(self.lines, n)
+            self.widths[n] = []
+            self.counts[n] = []
+        k = bisect.bisect_left(self.widths[n], m)
+        self.widths[n].insert(k, m)
+        self.counts[n].insert(k, answer)
+
+        if len(self.answers) > self.cache_size:
+            (n, m), _ = self.answers.popitem(last=False)
+            k = bisect.bisect_left(self.widths[n], m)
+            del self.widths[n][k]
+            del self.counts[n][k]
+            if not self.widths[n]:
+                del self.widths[n]
+                del self.counts[n]
+                del self.lines[bisect.bisect_left(self.lines, n)]
+
+    # Answers a list of (n, m) queries, in order.
+    def queries(self, pairs, stats=None):
+        return [self.query(n, m, stats) for n, m in pairs]
+
+# Reads one instance from an iterator of whitespace-separated tokens (str or bytes), in the input format described above.
+# Returns the arguments of solve as a tuple.
+def read_instance(tokens):
+    # Number of words provided in the input sequence.
+    k = int(next(tokens))
+    # Words.
+    words = [next(tokens) for _ in range(k)]
+    # Number of lines (n) and the maximum width of each line (m).
+    n = int(next(tokens))
+    m = int(next(tokens))
+    return words, n, m
+
+# Maximum number of words that fit into n lines of width m, using the exact engine (max_words).
+# -> words : List of words. It is not modified.
+# -> n     : Number of lines.
+# -> m     : Maximum width of each line.
+# -> stats : Optional statistics object (see max_words).
+def solve(words, n, m, stats=None):
+    return max_words(words, n, m, stats)
+
+# Same as solve, but stops at a time limit: returns (count, proven optimal), see max_words_anytime.
+# -> seconds : Time limit, from the call.
+def solve_within(words, n, m, seconds, stats=None):
+    return max_words_anytime(words, n, m, time.monotonic() + seconds, stats)
+
+# Same answer as solve, computed with the backtracking search (justify_words).
+# -> words : List of words. It is not modified.
+# -> n     : Number of lines.
+# -> m     : Maximum width of each line.
+# -> stats : Optional statistics object, receives the counters of justify_words and the "search" phase time.
+def solve_search(words, n, m, stats=None):
+    # Filters out words that are longer than the maximum line width (m).
+    words = [w for w in words if len(w) <= m]
+
+    # This sorts the words list based on the custom key specified in the 'key' argument.
+    # A lambda function is a short, anonymous function that takes an input x (in this case, a word from the words list). It returns a tuple (-len(x), x) as the sorting key 
+    # for each word.
+    # -> -len(x) : This calculates the negative length of the word. Sorting prioritizes longer words because the negative sign reverses the natural order of integers 
+    # (ascending).
+    # -> x       : This is the word itself. In case two words have the same length, they are sorted alphabetically (ascending order) as a tie-breaker.
+    words.sort(key=lambda x: (-len(x), x))
+
+    with phase(stats, "search"):
+        return justify_words(words, n, m, stats=stats)
 
-        # Try placing words in non-empty lines    
-        # Checks if the word can fit into the current line j. The condition ensures there is enough space, including one space between words. 
-        elif n_lines[j] + 1 + len(words[i]) <= m:
-            # Add the word and a space to the line's total length.
-            n_lines[j] += 1 + len(words[i])
-            # Recursively process the next word, incrementing the count.
-            justify_words(i + 1, n_lines, count + 1, words)
-            # Backtrack by removing the word and space from the line after exploring this option.
-            n_lines[j] -= 1 + len(words[i]) 
-
-    # Skip the current word without placing it in any line. Recursively moves to the next word without changing the count.
-    justify_words(i + 1, n_lines, count, words)
-
-# Number of words provided in the input sequence.
-k = int(input())
-# Words.
-words = []
-for i in range(k):
-    words.append(input().strip())
-# Number of lines (n) and the maximum width of each line (m).
-n, m = map(int, input().split())
-
-# Filters out words that are longer than the maximum line width (m).
-words = [w for w in words if len(w) <= m]
-
-# This sorts the words list based on the custom key specified in the 'key' argument.
-# A lambda function is a short, anonymous function that takes an input x (in this case, a word from the words list). It returns a tuple (-len(x), x) as the sorting key 
-# for each word.
-# -> -len(x) : This calculates the negative length of the word. Sorting prioritizes longer words because the negative sign reverses the natural order of integers 
-# (ascending).
-# -> x       : This is the word itself. In case two words have the same length, they are sorted alphabetically (ascending order) as a tie-breaker.
-words.sort(key=lambda x: (-len(x), x))
-
-# Initializes a list of size n, with each element set to 0. This represents the total length of words in each line, initially empty.
-n_lines = [0] * n
-# Sets the initial maximum word count to 0
-result = 0
-
-# Calls the recursive function with:
-# -> 0      : Starting index for the words list.
-# -> n_lines: The empty lines array.
-# -> 0      : Initial count of placed words.
-# -> words  : The list of words.
-justify_words(0, n_lines, 0, words)
-
-print(result, end = "")
+def main():
+    print(solve(*read_instance(iter(sys.stdin.read().split()))), end = "")
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+PARALLEL RUNNER
+
+Description:
+-> Same input and output as BATCH_RUNNER, but the instances are solved by a pool of worker processes.
+-> Instances are sent to the workers in chunks (one task per chunk), so the cost of sending a task is shared by many instances.
+-> Answers are written in input order.
+-> Only a bounded number of chunks is in flight at any time, so very long inputs are not all queued in memory at once.
+-> Each worker imports the solver module once. If the module has a warm_up() function (DANCE_DEV builds its state tables there),
+   it is called once per worker, before any instance is solved.
+
+Usage:
+python PARALLEL_RUNNER.py PROBLEM [FILE] [-j WORKERS] [-c CHUNK]
+
+PROBLEM -> BUS_COUNT, DANCE_DEV or JUSTIFY_WORDS.
+FILE    -> Input file, standard input if missing.
+WORKERS -> Number of worker processes (at least 1), the number of CPUs if missing.
+CHUNK   -> Number of instances per task (at least 1, default 64). Use small chunks for slow instances (large JUSTIFY_WORDS cases).
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import importlib
+import itertools
+import os
+import sys
+
+from BATCH_RUNNER import PROBLEMS, read_instances, tokenize
+
+# Solver module of the worker process, set once by init_worker.
+_module = None
+
+# Runs once in every worker process.
+# -> problem : Name of the problem (one of PROBLEMS).
+def init_worker(problem):
+    global _module
+    _module = importlib.import_module(problem)
+    warm_up = getattr(_module, "warm_up", None)
+    if warm_up is not None:
+        warm_up()
+
+# Solves one chunk of instances in a worker and returns the list of answers.
+def solve_chunk(chunk):
+    return [_module.solve(*instance) for instance in chunk]
+
+# Splits an iterable into lists of at most size items.
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+# Yields the answer of each instance, in input order.
+# -> problem   : Name of the problem (one of PROBLEMS).
+# -> instances : Iterable of argument tuples of the module's solve function.
+# -> workers   : Number of worker processes (None: number of CPUs).
+# -> chunksize : Number of instances per task.
+def solve_parallel(problem, instances, workers=None, chunksize=64):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1 or chunksize < 1:
+        raise ValueError("workers and chunksize must be at least 1")
+    with concurrent.futures.ProcessPoolExecutor(workers, initializer=init_worker, initargs=(problem,)) as pool:
+        # Futures of the submitted chunks, oldest first. At most 2 chunks per worker are pending, so the workers never wait for work
+        # while the parent is not too far ahead of the output.
+        pending = collections.deque()
+        for chunk in chunked(instances, chunksize):
+            pending.append(pool.submit(solve_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+# Solves every instance of data with a process pool and writes the answers to out, one per line.
+# -> problem   : Name of the problem (one of PROBLEMS).
+# -> data      : Input contents, as bytes.
+# -> out       : Binary output stream.
+# -> workers   : Number of worker processes (None: number of CPUs).
+# -> chunksize : Number of instances per task.
+def run(problem, data, out, workers=None, chunksize=64):
+    module = importlib.import_module(problem)
+    instances = read_instances(module, tokenize(data))
+    for answer in solve_parallel(problem, instances, workers, chunksize):
+        out.write(b"%d\n" % answer)
+    out.flush()
+
+# argparse type of the options that must be at least 1.
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be at least 1: %r" % text)
+    return value
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve many instances of one problem with a process pool.")
+    parser.add_argument("problem", choices=PROBLEMS)
+    parser.add_argument("file", nargs="?", help="input file (default: standard input)")
+    parser.add_argument("-j", "--workers", type=positive_int, default=None, help="number of worker processes (default: number of CPUs)")
+    parser.add_argument("-c", "--chunk", type=positive_int, default=64, help="number of instances per task (default: 64)")
+    args = parser.parse_args()
+
+    if args.file is not None:
+        with open(args.file, "rb") as f:
+            data = f.read()
+    else:
+        data = sys.stdin.buffer.read()
+
+    run(args.problem, data, sys.stdout.buffer, args.workers, args.chunk)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+SOLVE CLIENT
+
+Description:
+-> Sends one input to a running SOLVE_SERVER and prints the answer exactly like the solver script would:
+   python SOLVE_CLIENT.py BUS_COUNT < input  gives the same output as  python BUS_COUNT.py < input.
+-> Only the socket module is used, so the client starts much faster than a solver script (no solver, NumPy or asyncio import).
+-> --stats prints the server's statistics (JSON) instead.
+
+Usage:
+python SOLVE_CLIENT.py PROBLEM [--socket PATH | --port PORT] < input
+python SOLVE_CLIENT.py --stats [--socket PATH | --port PORT]
+
+Exit status: 0 on success, 1 if the server reported an error (printed to standard error).
+"""
+
+import socket
+import sys
+
+# Default address of the server (same as SOLVE_SERVER.SOCKET).
+SOCKET = "/tmp/solve_server.sock"
+
+# What each solver script prints after the answer.
+ENDINGS = {"BUS_COUNT": "\n", "DANCE_DEV": "", "JUSTIFY_WORDS": ""}
+
+# Opens a connection to the server: Unix socket path, or localhost TCP port if port is not None.
+def connect(path=SOCKET, port=None):
+    if port is not None:
+        return socket.create_connection(("127.0.0.1", port))
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    return client
+
+# Sends one request and returns the server's response line (without the newline).
+# -> request : Request bytes, see the protocol in SOLVE_SERVER.
+def request(client, data):
+    client.sendall(data)
+    response = client.makefile("rb").readline()
+    if not response:
+        raise ConnectionError("the server closed the connection")
+    return response.rstrip(b"\n")
+
+# Returns the server's answer for one input in the problem's text format (raises RuntimeError on a server error).
+def solve(problem, data, path=SOCKET, port=None):
+    with connect(path, port) as client:
+        response = request(client, b"SOLVE %s %d\n" % (problem.encode(), len(data)) + data)
+    if response.startswith(b"ERROR"):
+        raise RuntimeError(response[6:].decode())
+    return int(response)
+
+def main():
+    args = sys.argv[1:]
+    path = SOCKET
+    port = None
+    # Minimal option parsing, argparse would add to the start-up time.
+    positional = []
+    while args:
+        arg = args.pop(0)
+        if arg == "--socket" and args:
+            path = args.pop(0)
+        elif arg == "--port" and args:
+            port = int(args.pop(0))
+        else:
+            positional.append(arg)
+
+    if positional == ["--stats"]:
+        with connect(path, port) as client:
+            print(request(client, b"STATS\n").decode())
+        return
+    if len(positional) != 1 or positional[0] not in ENDINGS:
+        sys.exit("usage: python SOLVE_CLIENT.py {%s|--stats} [--socket PATH | --port PORT]" % ",".join(ENDINGS))
+
+    problem = positional[0]
+    try:
+        answer = solve(problem, sys.stdin.buffer.read(), path, port)
+    except RuntimeError as e:
+        sys.exit(str(e))
+    print(answer, end=ENDINGS[problem])
+
+if __name__ == "__main__":
+    main()
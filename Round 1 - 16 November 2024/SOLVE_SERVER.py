@@ -0,0 +1,343 @@
+"""
+SOLVE SERVER
+
+Description:
+-> Long-running solver for BUS_COUNT, DANCE_DEV and JUSTIFY_WORDS, so that a solve does not pay for starting Python and importing
+   the solvers. SOLVE_CLIENT.py sends one input to it and prints the answer, like running the solver script itself.
+-> Listens on a Unix socket (default /tmp/solve_server.sock) or on a localhost TCP port, and serves many clients concurrently (asyncio).
+-> Small instances are solved in the server process. Large ones (see HEAVY) are sent to a pool of worker processes, so that one
+   long search does not hold up the other requests. Large inputs (see PARSE_INLINE) are also parsed by the pool and hashed in a
+   thread, so that the event loop never goes through them token by token.
+-> Text inputs are read and solved as the solver scripts do it, so the answers and the error messages are the same.
+-> If a worker process dies (out of memory, crash), the pool is rebuilt and the request is tried once more.
+-> Warm caches: answers of recent inputs (LRU), and the shortest-path trees of recent BUS_COUNT networks (BUS_COUNT.TreeCache).
+-> Keeps per-problem latency statistics (requests, errors, cache hits, pool solves, mean / p50 / p99 / max seconds).
+
+Protocol (one connection can send any number of requests):
+SOLVE PROBLEM LENGTH\\n followed by LENGTH bytes of input in the problem's usual text format -> answer\\n, or ERROR message\\n.
+A JSON object on one line, {"problem": P, "input": TEXT} or {"problem": P, "args": [arguments of P's solve]}
+                                                          -> {"answer": A} or {"error": message} on one line.
+STATS\\n                                                   -> statistics as a JSON object on one line.
+
+Usage:
+python SOLVE_SERVER.py [--socket PATH | --port PORT] [-j WORKERS] [--cache SIZE]
+"""
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import hashlib
+import importlib
+import json
+import os
+import signal
+import socket
+import stat
+import statistics
+import sys
+import time
+
+from BATCH_RUNNER import PROBLEMS
+from PARALLEL_RUNNER import positive_int
+
+import BUS_COUNT
+
+# Default address of the server.
+SOCKET = "/tmp/solve_server.sock"
+
+# Instances larger than these sizes are solved by the process pool: problem -> (size of the instance, largest size solved inline).
+# The JUSTIFY_WORDS bounds and searches grow with the line width as well as with the number of words (200 words up to m = 10).
+HEAVY = {
+    "BUS_COUNT": (lambda M, dist_mat, no_of_emp, max_emp: M, 300),
+    "DANCE_DEV": (lambda steps: len(steps), 200000),
+    "JUSTIFY_WORDS": (lambda words, n, m: len(words) * (m + 1), 200 * 11),
+}
+
+# Requests longer than this many bytes are decoded, hashed and parsed off the event loop (text inputs are parsed and solved by the
+# pool, whatever the size of the instance).
+PARSE_INLINE = 1 << 16
+
+# Longest request line accepted (JSON requests hold the whole input on one line).
+LINE_LIMIT = 1 << 28
+
+# Number of recent latencies kept per problem for the percentiles.
+LATENCY_WINDOW = 1000
+
+# Shortest-path trees of the process (server or worker), reused across requests with the same network.
+_trees = BUS_COUNT.TreeCache()
+
+# Solves one instance with the problem's module, in the server or in a worker process.
+# -> function : Name of the module's function that solves the instance (see parse_text).
+def solve_instance(problem, instance, function="solve"):
+    module = importlib.import_module(problem)
+    if problem == "BUS_COUNT" and function == "solve":
+        return module.solve(*instance, cache=_trees)
+    return getattr(module, function)(*instance)
+
+# Parses one input in the problem's text format as the solver script does (its main), and returns (name of the module's function
+# that solves it, instance). DANCE_DEV reads the bytes with read_codes and solves the tile ids with min_moves_buffer, the other
+# scripts split the decoded text and call solve.
+# -> data : Input bytes.
+def parse_text(problem, data):
+    module = importlib.import_module(problem)
+    if problem == "DANCE_DEV":
+        return "min_moves_buffer", (module.read_codes(data),)
+    try:
+        return "solve", module.read_instance(iter(data.decode().split()))
+    except StopIteration:
+        # read_instance ran out of tokens. Inside a coroutine, StopIteration would turn into a RuntimeError.
+        raise ValueError("truncated input") from None
+
+# Parses and solves one input in the problem's text format, in a worker process.
+def solve_text_instance(problem, data):
+    function, instance = parse_text(problem, data)
+    return solve_instance(problem, instance, function)
+
+# Runs once in every worker process: imports the solvers and calls their optional warm_up() function.
+def init_worker():
+    for problem in PROBLEMS:
+        warm_up = getattr(importlib.import_module(problem), "warm_up", None)
+        if warm_up is not None:
+            warm_up()
+
+# Latency statistics of one problem.
+class Latency:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.pool_solves = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.recent = collections.deque(maxlen=LATENCY_WINDOW)
+
+    # Records the latency (seconds) of one request.
+    def record(self, seconds):
+        self.requests += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+        self.recent.append(seconds)
+
+    def as_dict(self):
+        stats = {"requests": self.requests, "errors": self.errors, "cache hits": self.cache_hits, "pool solves": self.pool_solves}
+        if self.recent:
+            recent = sorted(self.recent)
+            stats.update({
+                "mean seconds": self.total / self.requests,
+                "p50 seconds": statistics.median(recent),
+                "p99 seconds": recent[min(len(recent) - 1, int(len(recent) * 0.99))],
+                "max seconds": self.maximum,
+            })
+        return stats
+
+class SolveServer:
+    # -> workers    : Number of worker processes of the pool (None: number of CPUs).
+    # -> cache_size : Number of answers kept in the answer cache.
+    def __init__(self, workers=None, cache_size=4096):
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.pool = concurrent.futures.ProcessPoolExecutor(self.workers, initializer=init_worker)
+        self.pool_restarts = 0
+        self.cache_size = cache_size
+        # Answer cache: (problem, digest of the input) -> answer, least recently used first.
+        self.answers = collections.OrderedDict()
+        self.latency = {problem: Latency() for problem in PROBLEMS}
+        self.started = time.time()
+        init_worker()
+
+    # Starts every worker process now, so that the first heavy request does not pay for it.
+    async def warm_up(self):
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, os.getpid) for _ in range(self.workers)))
+
+    # Returns the answer of one input, from the answer cache or computed and then cached.
+    # -> problem : Name of the problem (one of PROBLEMS).
+    # -> key     : Digest of the input, for the answer cache.
+    # -> compute : Function returning an awaitable of the answer, called only if the answer is not cached.
+    async def cached(self, problem, key, compute):
+        answer = self.answers.get((problem, key))
+        if answer is not None:
+            self.answers.move_to_end((problem, key))
+            self.latency[problem].cache_hits += 1
+            return answer
+
+        answer = await compute()
+        self.answers[problem, key] = answer
+        if len(self.answers) > self.cache_size:
+            self.answers.popitem(last=False)
+        return answer
+
+    # Runs function(*args) in the pool. If the pool is broken (a worker died), it is replaced and the call is tried once more.
+    async def run_in_pool(self, function, *args):
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = self.pool
+            try:
+                return await loop.run_in_executor(pool, function, *args)
+            except concurrent.futures.process.BrokenProcessPool:
+                # Concurrent requests on the same broken pool replace it only once.
+                if self.pool is pool:
+                    self.pool = concurrent.futures.ProcessPoolExecutor(self.workers, initializer=init_worker)
+                    self.pool_restarts += 1
+                    pool.shutdown(wait=False, cancel_futures=True)
+                if attempt:
+                    raise
+
+    # Solves one instance in the server process, or in the pool if it is large (HEAVY).
+    # -> function : Name of the module's function that solves the instance.
+    async def solve(self, problem, instance, function="solve"):
+        size, limit = HEAVY[problem]
+        if size(*instance) > limit:
+            self.latency[problem].pool_solves += 1
+            return await self.run_in_pool(solve_instance, problem, instance, function)
+        return solve_instance(problem, instance, function)
+
+    # Solves a text request: data is the input in the problem's text format.
+    # Small inputs are keyed by their tokens, so that inputs that only differ in whitespace share their answer. Large ones are keyed
+    # by their bytes, hashed in a thread (hashlib releases the GIL), and parsed and solved by the pool.
+    async def solve_text(self, problem, data):
+        if len(data) > PARSE_INLINE:
+            loop = asyncio.get_running_loop()
+            key = (await loop.run_in_executor(None, hashlib.sha256, data)).digest()
+
+            def compute():
+                self.latency[problem].pool_solves += 1
+                return self.run_in_pool(solve_text_instance, problem, data)
+            return await self.cached(problem, key, compute)
+
+        key = hashlib.sha256(b" ".join(data.split())).digest()
+
+        async def compute():
+            function, instance = parse_text(problem, data)
+            return await self.solve(problem, instance, function)
+        return await self.cached(problem, key, compute)
+
+    # Solves a JSON request (dict with "problem" and either "input" or "args") and returns the answer.
+    # -> large : True if the request line was longer than PARSE_INLINE, the arguments are then hashed in a thread.
+    async def solve_json(self, request, large=False):
+        problem = request.get("problem")
+        if problem not in PROBLEMS:
+            raise ValueError("unknown problem: %r" % (problem,))
+        if "input" in request:
+            return await self.solve_text(problem, request["input"].encode())
+        args = request["args"]
+        digest = lambda: hashlib.sha256(json.dumps(args).encode()).digest()
+        key = await asyncio.get_running_loop().run_in_executor(None, digest) if large else digest()
+        return await self.cached(problem, key, lambda: self.solve(problem, tuple(args)))
+
+    def stats(self):
+        return {
+            "uptime seconds": time.time() - self.started,
+            "cached answers": len(self.answers),
+            "cached trees": len(_trees.trees),
+            "pool restarts": self.pool_restarts,
+            "problems": {problem: latency.as_dict() for problem, latency in self.latency.items()},
+        }
+
+    # Serves one connection until the client closes it.
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                start = time.perf_counter()
+                line = line.strip()
+                problem = None
+                failed = False
+
+                if line.startswith(b"{"):
+                    try:
+                        large = len(line) > PARSE_INLINE
+                        if large:
+                            request = await asyncio.get_running_loop().run_in_executor(None, json.loads, line)
+                        else:
+                            request = json.loads(line)
+                        # Requests for an unknown problem are not counted in the statistics.
+                        if request.get("problem") in PROBLEMS:
+                            problem = request["problem"]
+                        response = {"answer": await self.solve_json(request, large)}
+                    except Exception as e:
+                        failed = True
+                        response = {"error": "%s: %s" % (type(e).__name__, e)}
+                    writer.write(json.dumps(response).encode() + b"\n")
+                elif line == b"STATS":
+                    writer.write(json.dumps(self.stats()).encode() + b"\n")
+                else:
+                    parts = line.split()
+                    if len(parts) != 3 or parts[0] != b"SOLVE" or parts[1].decode(errors="replace") not in PROBLEMS or not parts[2].isdigit():
+                        writer.write(b"ERROR bad request\n")
+                        break
+                    problem = parts[1].decode()
+                    data = await reader.readexactly(int(parts[2]))
+                    try:
+                        response = b"%d\n" % await self.solve_text(problem, data)
+                    except Exception as e:
+                        failed = True
+                        response = ("ERROR %s: %s\n" % (type(e).__name__, e)).encode()
+                    writer.write(response)
+
+                if problem is not None:
+                    self.latency[problem].record(time.perf_counter() - start)
+                    if failed:
+                        self.latency[problem].errors += 1
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+# Removes a socket file left by a server that is no longer running. Exits with an error if path is not a socket, or if a server
+# still accepts connections on it.
+def remove_stale_socket(path):
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        sys.exit("%s exists and is not a socket" % path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+    sys.exit("a server is already listening on %s" % path)
+
+# Runs the server until SIGINT or SIGTERM.
+async def serve(args):
+    if args.port is None:
+        remove_stale_socket(args.socket)
+    server = SolveServer(args.workers, args.cache)
+    await server.warm_up()
+    if args.port is not None:
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", args.port, limit=LINE_LIMIT)
+        address = "127.0.0.1:%d" % args.port
+    else:
+        listener = await asyncio.start_unix_server(server.handle, args.socket, limit=LINE_LIMIT)
+        address = args.socket
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    print("solve server listening on %s" % address, file=sys.stderr)
+    try:
+        async with listener:
+            await stop.wait()
+    finally:
+        server.pool.shutdown(cancel_futures=True)
+        if args.port is None and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve BUS_COUNT, DANCE_DEV and JUSTIFY_WORDS solves over a local socket.")
+    parser.add_argument("--socket", default=SOCKET, help="Unix socket path (default: %s)" % SOCKET)
+    parser.add_argument("--port", type=int, help="listen on this localhost TCP port instead of the Unix socket")
+    parser.add_argument("-j", "--workers", type=positive_int, default=None, help="number of worker processes (default: number of CPUs)")
+    parser.add_argument("--cache", type=int, default=4096, help="number of cached answers (default: 4096)")
+    args = parser.parse_args()
+    asyncio.run(serve(args))
+
+if __name__ == "__main__":
+    main()
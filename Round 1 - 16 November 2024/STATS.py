@@ -0,0 +1,16 @@
+"""
+STATS
+
+Description:
+-> Helper shared by the solvers (BUS_COUNT, DANCE_DEV, JUSTIFY_WORDS) for their optional statistics.
+-> The statistics object itself (counters, phase timers, JSON / CSV output) is INSTRUMENT.Stats. This module only imports contextlib,
+   so the solvers do not pay for importing INSTRUMENT when statistics are off.
+"""
+
+import contextlib
+
+# Times a phase of the solver with stats.phase when statistics are collected (see INSTRUMENT.py), does nothing otherwise.
+# -> stats : Statistics object or None.
+# -> name  : Name of the phase.
+def phase(stats, name):
+    return stats.phase(name) if stats is not None else contextlib.nullcontext()